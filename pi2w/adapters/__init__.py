@@ -1,5 +1,6 @@
 """Adapters package."""
 
-from .openai_adapter import OpenAIAdapter
+from .downloader import ImageDownloader
+from .openai_adapter import GeneratedImage, OpenAIAdapter
 
-__all__ = ["OpenAIAdapter"]
+__all__ = ["GeneratedImage", "ImageDownloader", "OpenAIAdapter"]
@@ -0,0 +1,48 @@
+"""Pooled, streaming image downloads."""
+
+import importlib.util
+
+import httpx
+from PIL import Image, ImageFile
+
+from ..config import DownloadConfig
+
+
+class ImageDownloader:
+    """Downloads generated images over one long-lived connection pool.
+
+    Connections to the image CDN are kept alive between generations, and
+    HTTP/2 is used when the optional ``h2`` package is installed. Bodies
+    are fed to an incremental decoder as they arrive, so decoding overlaps
+    the transfer, and kept once in a single growing buffer for archiving.
+    """
+
+    def __init__(self, config: DownloadConfig | None = None):
+        self._config = config or DownloadConfig()
+        self._client = httpx.AsyncClient(
+            http2=self._config.http2 and importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(self._config.timeout, connect=self._config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self._config.max_connections,
+                max_keepalive_connections=self._config.max_keepalive_connections,
+                keepalive_expiry=self._config.keepalive_expiry,
+            ),
+            follow_redirects=True,
+        )
+
+    async def download(self, url: str) -> tuple[Image.Image, bytearray]:
+        """Download and decode an image; also returns the bytes as received."""
+        parser = ImageFile.Parser()
+        # Appended to in place: joining a list of chunks at the end would
+        # briefly hold the body twice.
+        body = bytearray()
+        async with self._client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(self._config.chunk_size):
+                parser.feed(chunk)
+                body += chunk
+        return parser.close(), body
+
+    async def aclose(self) -> None:
+        """Close the connection pool."""
+        await self._client.aclose()
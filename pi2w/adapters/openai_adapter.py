@@ -1,46 +1,87 @@
 """OpenAI API adapter."""
 
+import base64
 import os
+from dataclasses import dataclass
 from typing import Protocol
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
+
+from ..config import OpenAIConfig
+
+
+@dataclass(frozen=True)
+class GeneratedImage:
+    """A generated image, either inline or as a URL to download."""
+    url: str | None = None
+    data: bytes | None = None
 
 
 class LLMClient(Protocol):
     """Protocol for LLM operations."""
-    def generate_text(self, system_prompt: str, user_prompt: str, 
-                      max_tokens: int, temperature: float) -> str: ...
-    
-    def generate_image(self, prompt: str, size: str) -> str: ...
+    async def generate_text(self, system_prompt: str, user_prompt: str,
+                            max_tokens: int, temperature: float) -> str: ...
+
+    async def generate_image(self, prompt: str, size: str) -> GeneratedImage: ...
 
 
 class OpenAIAdapter:
-    """Adapts OpenAI client to our LLMClient protocol."""
-    
-    def __init__(self, api_key: str | None = None):
-        self._client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
-    
-    def generate_text(self, system_prompt: str, user_prompt: str,
-                      max_tokens: int = 50, temperature: float = 0.9) -> str:
+    """Adapts the async OpenAI client to our LLMClient protocol.
+
+    A single pooled HTTP client is shared by every call so concurrent
+    generations reuse connections instead of blocking the event loop.
+    """
+
+    def __init__(self, api_key: str | None = None, config: OpenAIConfig | None = None):
+        self._config = config or OpenAIConfig()
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                self._config.request_timeout,
+                connect=self._config.connect_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=self._config.max_connections,
+                max_keepalive_connections=self._config.max_keepalive_connections,
+            ),
+        )
+        self._client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            max_retries=self._config.max_retries,
+            http_client=self._http_client,
+        )
+
+    async def generate_text(self, system_prompt: str, user_prompt: str,
+                            max_tokens: int = 50, temperature: float = 0.9) -> str:
         """Generate text using chat completion."""
-        response = self._client.chat.completions.create(
-            model="gpt-4o-mini",
+        response = await self._client.chat.completions.create(
+            model=self._config.text_model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
             max_tokens=max_tokens,
             temperature=temperature,
+            timeout=self._config.text_timeout,
         )
         return response.choices[0].message.content.strip()
-    
-    def generate_image(self, prompt: str, size: str = "1792x1024") -> str:
-        """Generate image and return URL."""
-        response = self._client.images.generate(
-            model="dall-e-3",
+
+    async def generate_image(self, prompt: str, size: str = "1792x1024") -> GeneratedImage:
+        """Generate an image, returned inline or as a URL per the config."""
+        response = await self._client.images.generate(
+            model=self._config.image_model,
             prompt=prompt,
             size=size,
             quality="standard",
             n=1,
+            response_format=self._config.image_response_format,
+            timeout=self._config.image_timeout,
         )
-        return response.data[0].url
+        image = response.data[0]
+        if image.b64_json:
+            return GeneratedImage(data=base64.b64decode(image.b64_json))
+        return GeneratedImage(url=image.url)
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        await self._client.close()
@@ -1,31 +1,94 @@
 """FastAPI application factory."""
 
+import asyncio
 import io
-from dataclasses import dataclass, field
-from datetime import datetime
+import logging
+import re
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, Response
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from PIL import Image
 
+from .adapters.downloader import ImageDownloader
 from .adapters.openai_adapter import OpenAIAdapter
-from .config import DisplayConfig, FontConfig, QuoteConfig
+from .config import (
+    CacheConfig,
+    CoalesceConfig,
+    DisplayConfig,
+    DitherConfig,
+    DownloadConfig,
+    FontConfig,
+    HistoryConfig,
+    JobConfig,
+    PoolConfig,
+    QuoteConfig,
+    RenderConfig,
+    StorageConfig,
+    WarmStartConfig,
+)
+from .imaging.dither import DITHER_METHODS
+from .imaging.framebuffer import Framebuffer, pack_framebuffer
+from .imaging.parallel import ParallelDiffusion
 from .models import TimeOfDay
-from .services.art_service import ArtService
+from .services.art_service import ArtService, RenderedArt
+from .services.events import EventBus
+from .services.generations import current_slot
+from .services.history import HistoryStore
+from .services.jobs import JobQueue, JobQueueFull, JobRequest
+from .services.pool import ArtPool
+from .services.renderer import RenderExecutor
+from .services.shared import SharedState
+from .services.singleflight import SingleFlight
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-@dataclass
-class GenerationState:
-    """Tracks the last generated art."""
-    last_image: bytes | None = None
-    last_prompt: str | None = None
-    last_quote: str | None = None
-    last_artist: str | None = None
-    last_time_of_day: str | None = None
-    last_generated_at: datetime | None = None
-    generation_count: int = 0
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Whether the client's cached copy is current.
+    
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the client sent no entity tags.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _image_response(
+    request: Request,
+    content: bytes | memoryview,
+    etag: str,
+    created_at: datetime,
+    headers: dict[str, str],
+    media_type: str = "image/png",
+) -> Response:
+    """Image response with validators, or 304 when the client already has it."""
+    last_modified = created_at.astimezone(UTC)
+    headers = {
+        **headers,
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
 
 
 def create_app() -> FastAPI:
@@ -35,16 +98,96 @@ def create_app() -> FastAPI:
     display_config = DisplayConfig()
     font_config = FontConfig()
     quote_config = QuoteConfig()
+    pool_config = PoolConfig()
+    cache_config = CacheConfig()
+    storage_config = StorageConfig()
+    dither_config = DitherConfig()
+    render_config = RenderConfig()
+    coalesce_config = CoalesceConfig()
+    job_config = JobConfig()
+    download_config = DownloadConfig()
+    history_config = HistoryConfig()
+    warm_config = WarmStartConfig()
     
     # Dependencies
     llm = OpenAIAdapter()
-    art_service = ArtService(llm, display_config, font_config, quote_config)
+    downloader = ImageDownloader(download_config)
+    parallel = ParallelDiffusion(dither_config.workers, dither_config.parallel_min_pixels)
+    renderer = RenderExecutor(render_config, font_config, storage_config.palette_dir, parallel)
+    events = EventBus()
+    history = (
+        HistoryStore(storage_config.history_dir, history_config)
+        if history_config.enabled else None
+    )
+    art_service = ArtService(
+        llm, display_config, font_config, quote_config, cache_config, storage_config,
+        renderer, events, downloader, history,
+    )
+    art_flights: SingleFlight[RenderedArt] = SingleFlight(coalesce_config.window_seconds)
+    # uvicorn runs several workers; the latest art, counters and generation
+    # leases live on disk so every worker sees the same ones.
+    shared = SharedState(storage_config.shared_dir, coalesce_config)
+    pool = ArtPool(art_service, pool_config, shared)
     
-    # Application
-    app = FastAPI(title="Pi2W Content Server", version="0.2.0")
+    # Set once caches are restored and render workers are up; /ready
+    # answers 503 until then.
+    ready = asyncio.Event()
+    
+    async def warm_start() -> None:
+        """Restore renders, pool images and pipelines from the last run."""
+        profiles = [display_config]
+        try:
+            if warm_config.enabled:
+                profiles += await art_service.warm_start(warm_config.max_profiles)
+                if pool_config.enabled:
+                    profiles += await pool.resume()
+            await renderer.warm(list(dict.fromkeys(profiles)), warm_config.render_processes)
+        except Exception:
+            logger.exception("Warm start failed; continuing cold")
+        if pool_config.enabled:
+            pool.start()
+        ready.set()
+    
+    async def relay_events() -> None:
+        """Announce art published by other workers to this worker's /events clients.
+        
+        The event bus is per process. The /tv page ignores an announcement
+        of the generation it already shows.
+        """
+        while True:
+            await asyncio.sleep(coalesce_config.relay_seconds)
+            if not events.subscribers:
+                continue
+            try:
+                latest = await shared.latest()
+            except Exception:
+                logger.exception("Reading the latest art failed")
+                continue
+            if latest is not None:
+                announce(latest.generation_id)
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        warming = asyncio.create_task(warm_start())
+        relay = asyncio.create_task(relay_events())
+        jobs.start()
+        yield
+        events.close()
+        for task in (warming, relay):
+            task.cancel()
+        await asyncio.gather(warming, relay, return_exceptions=True)
+        await jobs.stop()
+        await pool.stop()
+        await llm.aclose()
+        await downloader.aclose()
+        if history is not None:
+            await history.aclose()
+        renderer.close()
+        parallel.close()
+        shared.close()
 
-    # State for tracking last generation
-    state = GenerationState()
+    # Application
+    app = FastAPI(title="Pi2W Content Server", version="0.2.0", lifespan=lifespan)
     
     @app.get("/")
     async def root():
@@ -62,64 +205,53 @@ def create_app() -> FastAPI:
     
     @app.get("/health")
     async def health():
-        """Health check endpoint."""
-        return {"status": "ok", "timestamp": datetime.now().isoformat()}
+        """Liveness check; "ready" tells whether the warm start has finished."""
+        return {
+            "status": "ok",
+            "ready": ready.is_set(),
+            "timestamp": datetime.now().isoformat(),
+        }
+    
+    @app.get("/ready")
+    async def readiness():
+        """Readiness check for load balancers; 503 while the warm start is running."""
+        return JSONResponse(
+            {"ready": ready.is_set(), "timestamp": datetime.now().isoformat()},
+            status_code=200 if ready.is_set() else 503,
+        )
 
     @app.get("/status")
     async def status():
         """Detailed status including last generation info."""
+        latest = await shared.latest()
         return {
             "status": "ok",
             "timestamp": datetime.now().isoformat(),
             "last_generation": {
-                "generated_at": state.last_generated_at.isoformat() if state.last_generated_at else None,
-                "prompt": state.last_prompt,
-                "quote": state.last_quote,
-                "artist": state.last_artist,
-                "time_of_day": state.last_time_of_day,
-            } if state.last_generated_at else None,
-            "generation_count": state.generation_count,
+                "generated_at": latest.generated_at.isoformat(),
+                "prompt": latest.prompt,
+                "quote": latest.quote,
+                "artist": latest.artist,
+                "time_of_day": latest.time_of_day,
+            } if latest else None,
+            "generation_count": await shared.counter("generation_count"),
+            "pool": await pool.stats(),
+            "cache": art_service.cache.stats(),
+            "coalescing": art_flights.stats(),
+            "render": renderer.stats(),
+            "jobs": jobs.stats(),
+            "event_subscribers": events.subscribers,
         }
 
-    @app.get("/art/latest")
-    async def get_latest_art():
-        """Return the last generated art image."""
-        if not state.last_image:
-            raise HTTPException(status_code=404, detail="No art generated yet")
-
-        return Response(
-            content=state.last_image,
-            media_type="image/png",
-            headers={
-                "X-Generated-At": state.last_generated_at.isoformat() if state.last_generated_at else "",
-                "X-Time-Of-Day": state.last_time_of_day or "",
-                "Cache-Control": "public, max-age=60",
-            },
-        )
-    
     # Valid display parameter ranges
     MIN_SIZE = 100
     MAX_SIZE = 4096
     VALID_COLORS = {2, 3, 6, 7}
     
-    @app.get("/art")
-    async def get_art(
-        style: str | None = None, 
-        prompt: str | None = None,
-        width: int | None = None,
-        height: int | None = None,
-        colors: int | None = None,
-    ):
-        """Generate AI art based on time of day.
-        
-        Args:
-            style: Optional art style
-            prompt: Optional custom prompt
-            width: Display width (default: 800, range: 100-4096)
-            height: Display height (default: 480, range: 100-4096)
-            colors: Number of colors (2, 3, 6, or 7). Default: 6 for Spectra 6
-        """
-        # Validate size parameters
+    def validate_display_params(
+        width: int | None, height: int | None, colors: int | None, dither: str | None
+    ) -> None:
+        """Reject out-of-range display parameters with a 400."""
         if width is not None and not (MIN_SIZE <= width <= MAX_SIZE):
             raise HTTPException(
                 status_code=400, 
@@ -135,58 +267,346 @@ def create_app() -> FastAPI:
                 status_code=400,
                 detail=f"colors must be one of {sorted(VALID_COLORS)}"
             )
-        
-        time_of_day = TimeOfDay.current()
-        
-        try:
-            image, full_prompt, quote, artist = await art_service.generate_art(
-                time_of_day, style, prompt, width=width, height=height, num_colors=colors
+        if dither is not None and dither not in DITHER_METHODS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"dither must be one of {list(DITHER_METHODS)}"
             )
-            
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format="PNG")
-            img_bytes.seek(0)
-            image_data = img_bytes.getvalue()
+    
+    async def record_art(art: RenderedArt) -> None:
+        """Remember the most recent art for /status and /art/latest in every worker."""
+        await shared.publish(art)
+        announce(art.generation_id)
+    
+    announced: str | None = None
+    
+    def announce(generation_id: str | None) -> None:
+        """Tell this worker's /events clients about newly served art, once."""
+        nonlocal announced
+        if generation_id != announced:
+            announced = generation_id
+            events.publish("art_ready", {"generation_id": generation_id})
+    
+    def art_headers(art: RenderedArt) -> dict[str, str]:
+        """Generation details as response headers."""
+        def sanitize_header(s: str) -> str:
+            return re.sub(r'[^\x20-\x7E]', ' ', s[:200]).strip()
 
-            import re
-            def sanitize_header(s: str) -> str:
-                return re.sub(r'[^\x20-\x7E]', ' ', s[:200]).strip()
+        safe_prompt = sanitize_header(art.prompt)
+        safe_quote = sanitize_header(art.quote)
 
-            safe_prompt = sanitize_header(full_prompt)
-            safe_quote = sanitize_header(quote)
+        headers = {
+            "X-Time-Of-Day": art.time_of_day.value,
+            "X-Prompt": safe_prompt,
+            "X-Quote": safe_quote,
+        }
+        if art.generation_id:
+            headers["X-Generation-Id"] = art.generation_id
 
-            # Update state with last generation
-            state.last_image = image_data
-            state.last_prompt = full_prompt
-            state.last_quote = quote
-            state.last_artist = artist.name if artist else None
-            state.last_time_of_day = time_of_day.value
-            state.last_generated_at = datetime.now()
-            state.generation_count += 1
+        if art.artist:
+            headers["X-Artist"] = sanitize_header(art.artist.name)
+            headers["X-Artist-Style"] = sanitize_header(art.artist.style)
+        return headers
+    
+    def art_response(art: RenderedArt, request: Request) -> Response:
+        """PNG response with the generation details in headers."""
+        return _image_response(
+            request, art.image_data, art.etag, art.created_at, art_headers(art)
+        )
+    
+    @app.get("/events")
+    async def stream_events(request: Request):
+        """Server-sent events: generation_started, stage_finished and art_ready."""
+        return StreamingResponse(
+            events.stream(disconnected=request.is_disconnected),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
+    @app.get("/art/latest")
+    async def get_latest_art(
+        request: Request,
+        width: int | None = None,
+        height: int | None = None,
+        colors: int | None = None,
+        dither: str | None = None,
+    ):
+        """Return the last generated art image.
+        
+        With display parameters, the newest cached generation is rendered
+        for that profile instead; this never starts a new generation.
+        """
+        if any(p is not None for p in (width, height, colors, dither)):
+            validate_display_params(width, height, colors, dither)
+            # The latest art may come from another worker; its generation is
+            # then only in the history store.
+            latest = await shared.latest()
+            generation = None
+            if latest is not None and latest.generation_id is not None:
+                generation = await art_service.load_generation(latest.generation_id)
+            if generation is None:
+                generation = art_service.cache.latest()
+            if generation is None:
+                raise HTTPException(status_code=404, detail="No art generated yet")
+            profile = art_service.resolve_display_config(width, height, colors, dither)
+            art = await art_service.render_generation(generation, profile)
             headers = {
-                "X-Time-Of-Day": time_of_day.value,
-                "X-Prompt": safe_prompt,
-                "X-Quote": safe_quote,
+                **art_headers(art),
+                "X-Generated-At": generation.created_at.isoformat(),
+                "Cache-Control": "public, max-age=60",
             }
+            return _image_response(request, art.image_data, art.etag, art.created_at, headers)
 
-            if artist:
-                headers["X-Artist"] = sanitize_header(artist.name)
-                headers["X-Artist-Style"] = sanitize_header(artist.style)
+        latest = await shared.latest()
+        if latest is None:
+            raise HTTPException(status_code=404, detail="No art generated yet")
 
-            return Response(
-                content=image_data,
-                media_type="image/png",
-                headers=headers,
+        return _image_response(
+            request,
+            latest.image,
+            latest.etag,
+            latest.generated_at,
+            headers={
+                "X-Generated-At": latest.generated_at.isoformat(),
+                "X-Time-Of-Day": latest.time_of_day,
+                "Cache-Control": "public, max-age=60",
+            },
+        )
+    
+    jobs = JobQueue(art_service, job_config, pool if pool_config.enabled else None, record_art)
+    
+    async def obtain_art(
+        style: str | None,
+        prompt: str | None,
+        width: int | None,
+        height: int | None,
+        colors: int | None,
+        dither: str | None,
+    ) -> RenderedArt:
+        """Validate the request and produce art, from the pool or a generation."""
+        validate_display_params(width, height, colors, dither)
+        time_of_day = TimeOfDay.current()
+        profile = art_service.resolve_display_config(width, height, colors, dither)
+        
+        key = (profile, style, prompt, current_slot())
+        
+        async def generate() -> RenderedArt:
+            return await art_service.render_art(
+                time_of_day, style, prompt,
+                width=width, height=height, num_colors=colors, dither=dither,
             )
+        
+        async def produce() -> RenderedArt:
+            art = None
+            if style is None and prompt is None and pool_config.enabled:
+                art = await pool.pop(profile)
+            if art is None:
+                # Only one worker process generates for the key; the
+                # others pick up its result.
+                art = await shared.do(key, generate)
+            return art
+        
+        try:
+            # Identical requests arriving together (dashboards and displays
+            # refreshing on the hour) share a single generation.
+            art = await art_flights.do(key, produce)
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
+        await record_art(art)
+        return art
+    
+    @app.get("/art")
+    async def get_art(
+        request: Request,
+        style: str | None = None, 
+        prompt: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        colors: int | None = None,
+        dither: str | None = None,
+    ):
+        """Generate AI art based on time of day.
+        
+        Args:
+            style: Optional art style
+            prompt: Optional custom prompt
+            width: Display width (default: 800, range: 100-4096)
+            height: Display height (default: 480, range: 100-4096)
+            colors: Number of colors (2, 3, 6, or 7). Default: 6 for Spectra 6
+            dither: Dithering method (e.g. floyd-steinberg, bayer8, blue-noise)
+        """
+        art = await obtain_art(style, prompt, width, height, colors, dither)
+        return art_response(art, request)
+    
+    @app.get("/art.raw")
+    async def get_art_raw(
+        style: str | None = None, 
+        prompt: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        colors: int | None = None,
+        dither: str | None = None,
+    ):
+        """Same art as /art, as a packed framebuffer in the panel's color order.
+        
+        Layout and palette are described by the X-Width, X-Height,
+        X-Bits-Per-Pixel, X-Panel and X-Palette headers.
+        """
+        art = await obtain_art(style, prompt, width, height, colors, dither)
+        num_colors = colors or display_config.num_colors
+        
+        def pack() -> Framebuffer:
+            with Image.open(io.BytesIO(art.image_data)) as image:
+                return pack_framebuffer(image, num_colors)
+        
+        framebuffer = await asyncio.to_thread(pack)
+        return Response(
+            content=framebuffer.data,
+            media_type="application/octet-stream",
+            headers={**art_headers(art), **framebuffer.headers()},
+        )
+    
+    @app.post("/jobs", status_code=202)
+    async def create_job(
+        style: str | None = None,
+        prompt: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        colors: int | None = None,
+        dither: str | None = None,
+    ):
+        """Queue a generation and return its id immediately.
+        
+        Takes the same parameters as /art. Poll /jobs/{id} for progress and
+        fetch the result from /jobs/{id}/image.
+        """
+        validate_display_params(width, height, colors, dither)
+        try:
+            job = jobs.submit(JobRequest(style, prompt, width, height, colors, dither))
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return JSONResponse(
+            status_code=202,
+            content=job.to_dict(),
+            headers={"Location": f"/jobs/{job.id}"},
+        )
+    
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str):
+        """State and per-stage progress of a queued generation."""
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        return job.to_dict()
+    
+    @app.get("/jobs/{job_id}/image")
+    async def get_job_image(job_id: str, request: Request):
+        """Result of a finished generation."""
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        if job.art is None:
+            detail = f"Job failed: {job.error}" if job.error else f"Job is {job.state.value}"
+            raise HTTPException(status_code=409, detail=detail)
+        return art_response(job.art, request)
+    
+    def history_store() -> HistoryStore:
+        if history is None:
+            raise HTTPException(status_code=404, detail="History is disabled")
+        return history
+    
+    def with_links(item: dict) -> dict:
+        """Add URLs for the source and each stored render to a history entry."""
+        base = f"/art/history/{item['id']}"
+        for render in item["renders"]:
+            render["url"] = (
+                f"{base}/image?width={render['width']}&height={render['height']}"
+                f"&colors={render['colors']}&dither={render['dither']}"
+            )
+        return {**item, "url": base, "source_url": f"{base}/source"}
+    
+    @app.get("/art/history")
+    async def list_history(
+        page: int = 1,
+        per_page: int = 20,
+        artist: str | None = None,
+        time_of_day: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        colors: int | None = None,
+        dither: str | None = None,
+    ):
+        """Past generations, newest first.
+        
+        Filter by artist name, time of day, or display profile (generations
+        with a stored render for it).
+        """
+        store = history_store()
+        if page < 1 or not 1 <= per_page <= 100:
+            raise HTTPException(status_code=400, detail="page must be >= 1, per_page 1-100")
+        profile = None
+        if any(p is not None for p in (width, height, colors, dither)):
+            validate_display_params(width, height, colors, dither)
+            profile = art_service.resolve_display_config(width, height, colors, dither)
+        items, total = await store.page(page, per_page, artist, time_of_day, profile)
+        return {
+            "items": [with_links(item) for item in items],
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+        }
+    
+    @app.get("/art/history/{generation_id}")
+    async def get_history_entry(generation_id: str):
+        """Metadata and stored renders of a past generation."""
+        item = await history_store().get(generation_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Unknown generation")
+        return with_links(item)
+    
+    @app.get("/art/history/{generation_id}/image")
+    async def get_history_image(
+        generation_id: str,
+        request: Request,
+        width: int | None = None,
+        height: int | None = None,
+        colors: int | None = None,
+        dither: str | None = None,
+    ):
+        """A past generation rendered for a display profile.
+        
+        Stored renders are served as they are; other profiles are rendered
+        from the archived source without a new generation.
+        """
+        store = history_store()
+        validate_display_params(width, height, colors, dither)
+        profile = art_service.resolve_display_config(width, height, colors, dither)
+        stored = await store.rendered(generation_id, profile)
+        if stored is not None:
+            content, etag, created_at = stored
+            return _image_response(request, content, etag, created_at, {})
+        generation = await store.load_generation(generation_id)
+        if generation is None:
+            raise HTTPException(status_code=404, detail="Unknown generation")
+        art = await art_service.render_generation(generation, profile)
+        return art_response(art, request)
+    
+    @app.get("/art/history/{generation_id}/source")
+    async def get_history_source(generation_id: str):
+        """Original, unquantized image of a past generation, as DALL-E returned it."""
+        content = await history_store().source(generation_id)
+        if content is None:
+            raise HTTPException(status_code=404, detail="Unknown generation")
+        # Only the header is parsed, to name the format.
+        with Image.open(io.BytesIO(content)) as image:
+            media_type = Image.MIME.get(image.format, "application/octet-stream")
+        return Response(content=content, media_type=media_type)
     
     @app.get("/art/preview")
     async def preview_art(style: str | None = None, prompt: str | None = None):
         """Preview prompt without generating image."""
         time_of_day = TimeOfDay.current()
-        full_prompt, artist = art_service.preview_prompt(time_of_day, style, prompt)
+        full_prompt, artist = await art_service.preview_prompt(time_of_day, style, prompt)
         response = {"time_of_day": time_of_day.value, "prompt": full_prompt}
         if artist:
             response["artist"] = {
@@ -203,15 +623,25 @@ def create_app() -> FastAPI:
         height: int = 1080,
         colors: int = 7,
         interval: int = 30,
+        dither: str = "blue-noise",
     ):
         """Self-refreshing TV display page for Chromecast/Fire TV.
         
+        The page listens on /events and shows new art as soon as any client
+        causes it, so extra viewers don't cost extra generations.
+        
         Args:
             width: Display width (default: 1920 for 1080p TV)
             height: Display height (default: 1080)
             colors: Number of colors (default: 7 for full color TV)
             interval: Refresh interval in minutes (default: 30)
+            dither: Dithering method (default: blue-noise, a fast ordered mode)
         """
+        if dither not in DITHER_METHODS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"dither must be one of {list(DITHER_METHODS)}"
+            )
         interval_ms = interval * 60 * 1000
         return f"""<!DOCTYPE html>
 <html>
@@ -245,46 +675,61 @@ def create_app() -> FastAPI:
     <img id="art" alt="AI Generated Art">
     <div id="info"></div>
     <script>
-        const width = {width};
-        const height = {height};
-        const colors = {colors};
         const intervalMs = {interval_ms};
+        const basePath = window.location.pathname.replace(/\/tv$/, '');
+        const params = `width={width}&height={height}&colors={colors}&dither={dither}`;
+        const img = document.getElementById('art');
+        const info = document.getElementById('info');
+        let currentGeneration = null;
+        let shownAt = 0;
         
-        async function loadArt() {{
-            const img = document.getElementById('art');
-            const info = document.getElementById('info');
-            img.classList.remove('loaded');
+        // Show an image from the server. /art/latest only re-renders the newest
+        // generation for this screen; /art may start a new one, which the server
+        // shares between every viewer asking at the same time.
+        async function show(path) {{
+            const response = await fetch(`${{basePath}}${{path}}?${{params}}`, {{ cache: 'no-store' }});
+            if (!response.ok) throw new Error(`${{path}}: ${{response.status}}`);
             
-            const basePath = window.location.pathname.replace(/\/tv$/, '');
-            const url = `${{basePath}}/art?width=${{width}}&height=${{height}}&colors=${{colors}}&t=${{Date.now()}}`;
+            const blob = await response.blob();
+            const artist = response.headers.get('X-Artist') || '';
+            currentGeneration = response.headers.get('X-Generation-Id');
+            shownAt = Date.now();
+            
+            img.classList.remove('loaded');
+            img.onload = () => {{
+                img.classList.add('loaded');
+                URL.revokeObjectURL(img.src);
+            }};
+            img.src = URL.createObjectURL(blob);
             
+            const next = new Date(shownAt + intervalMs);
+            info.textContent = artist ? `${{artist}} · Next: ${{next.toLocaleTimeString()}}` : '';
+        }}
+        
+        // A failed fetch is retried as it was: a missing /art/latest must not
+        // turn into a paid generation. The interval below is the only caller of /art.
+        async function refresh(path) {{
             try {{
-                const response = await fetch(url);
-                if (!response.ok) throw new Error('Failed to load');
-                
-                const blob = await response.blob();
-                const objectUrl = URL.createObjectURL(blob);
-                
-                const artist = response.headers.get('X-Artist') || '';
-                const timeOfDay = response.headers.get('X-Time-Of-Day') || '';
-                
-                img.onload = () => {{
-                    img.classList.add('loaded');
-                    URL.revokeObjectURL(img.src);
-                }};
-                img.src = objectUrl;
-                
-                const now = new Date();
-                const next = new Date(now.getTime() + intervalMs);
-                info.textContent = artist ? `${{artist}} · Next: ${{next.toLocaleTimeString()}}` : '';
+                await show(path);
             }} catch (e) {{
                 info.textContent = 'Loading failed, retrying...';
-                setTimeout(loadArt, 10000);
+                setTimeout(() => refresh(path), 10000);
             }}
         }}
         
-        loadArt();
-        setInterval(loadArt, intervalMs);
+        // New art made for any viewer or display is shown without generating more.
+        const events = new EventSource(`${{basePath}}/events`);
+        events.addEventListener('art_ready', (event) => {{
+            const data = JSON.parse(event.data);
+            if (data.generation_id !== currentGeneration) refresh('/art/latest');
+        }});
+        
+        // Only ask for a new generation when nothing new arrived for a whole interval.
+        setInterval(() => {{
+            if (Date.now() - shownAt >= intervalMs) refresh('/art');
+        }}, Math.min(intervalMs, 60000));
+        
+        refresh('/art/latest');
     </script>
 </body>
 </html>"""
@@ -1,6 +1,8 @@
 """Configuration dataclasses for Pi2W server."""
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
 
 
 PALETTES = {
@@ -44,6 +46,9 @@ class DisplayConfig:
     width: int = 800
     height: int = 480
     num_colors: int = 6
+    # Error diffusion: floyd-steinberg, atkinson, jarvis, stucki
+    # Ordered: bayer4, bayer8, blue-noise (single vectorized pass); or none
+    dither: str = "floyd-steinberg"
     
     @property
     def palette_rgb(self) -> list[tuple[int, int, int]]:
@@ -60,8 +65,12 @@ class DisplayConfig:
 @dataclass(frozen=True)
 class FontConfig:
     """Font configuration for text rendering."""
-    size: int = 99
+    size: int = 99                     # Reference size that line_spacing is given for
     line_spacing: int = 20
+    min_size: int = 10                 # Quotes are set as large as fits the box,
+    max_size: int = 400                # between these sizes
+    box_width: float = 0.8             # Largest share of the image a quote may cover
+    box_height: float = 0.45
     paths: tuple[str, ...] = (
         "/usr/share/texmf/fonts/opentype/public/tex-gyre/texgyreschola-bold.otf",
         "/usr/share/texmf/fonts/opentype/public/tex-gyre/texgyrebonum-bold.otf",
@@ -90,3 +99,134 @@ class QuoteConfig:
         "letting go of what doesn't serve you",
         "the courage to be yourself",
     )
+
+
+@dataclass(frozen=True)
+class OpenAIConfig:
+    """OpenAI client configuration."""
+    text_model: str = "gpt-4o-mini"
+    image_model: str = "dall-e-3"
+    connect_timeout: float = 10.0
+    request_timeout: float = 60.0
+    text_timeout: float = 30.0
+    image_timeout: float = 90.0
+    image_response_format: str = "url"  # "b64_json" returns the image inline, skipping the download
+    max_retries: int = 2
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+
+
+@dataclass(frozen=True)
+class DownloadConfig:
+    """HTTP client for downloading generated images."""
+    connect_timeout: float = 10.0
+    timeout: float = 60.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 300.0    # Keep CDN connections open between generations
+    http2: bool = True                 # Used only when the h2 package is installed
+    chunk_size: int = 64 * 1024
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Background pre-generation pool configuration."""
+    enabled: bool = True
+    depth: int = 1                     # Ready images kept per display profile
+    max_age_minutes: int = 30          # Pooled images older than this are discarded
+    concurrency: int = 1               # Generations the producer runs at once
+    max_profiles: int = 4              # Display profiles tracked at once
+    profile_idle_minutes: int = 120    # Stop refilling profiles nobody has requested
+    poll_seconds: float = 60.0         # How often the producer re-checks the pool
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """Source-image and rendered-variant cache configuration."""
+    memory_budget_mb: int = 128        # Upper bound for cached images
+    share_minutes: int = 30            # Other profiles may reuse a generation this long
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    """On-disk locations for persistent caches."""
+    data_dir: Path = Path("data")
+    
+    @property
+    def palette_dir(self) -> Path:
+        """Compiled palette lookup tables."""
+        return self.data_dir / "palettes"
+    
+    @property
+    def history_dir(self) -> Path:
+        """Generation history: image blobs and the SQLite index."""
+        return self.data_dir / "history"
+    
+    @property
+    def shared_dir(self) -> Path:
+        """State shared by the server's worker processes."""
+        return self.data_dir / "shared"
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """uvicorn settings used by server.py."""
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = field(default_factory=lambda: int(os.getenv("WEB_CONCURRENCY", "4")))
+    graceful_shutdown_seconds: float = 10.0  # Then open /events streams are cut off
+
+
+def cpus_per_server_worker() -> int:
+    """CPU share of one uvicorn worker, for sizing its process pools."""
+    return max(1, (os.cpu_count() or 1) // ServerConfig().workers)
+
+
+@dataclass(frozen=True)
+class DitherConfig:
+    """Multi-process error diffusion for large displays."""
+    workers: int = field(default_factory=cpus_per_server_worker)
+    parallel_min_pixels: int = 2_000_000  # Smaller images dither in-process
+
+
+@dataclass(frozen=True)
+class RenderConfig:
+    """Worker pool for the overlay, quantize and encode stages."""
+    workers: int = field(default_factory=cpus_per_server_worker)
+    use_processes: bool = True         # False renders on a thread pool instead
+    png_compress_level: int = 6        # zlib level 0-9; paletted PNGs are small either way
+    max_pipelines: int = 16            # Display profiles kept ready per render worker
+
+
+@dataclass(frozen=True)
+class CoalesceConfig:
+    """Sharing one generation between identical concurrent /art requests."""
+    window_seconds: float = 10.0       # Later identical requests reuse a finished result
+    lease_seconds: float = 60.0        # Renewed while running; lapses if the worker dies
+    poll_seconds: float = 0.25         # How often other workers check on a running generation
+    relay_seconds: float = 2.0         # How often /events checks for other workers' art
+
+
+@dataclass(frozen=True)
+class JobConfig:
+    """Queued generations for POST /jobs."""
+    concurrency: int = 1               # Jobs generated at once
+    max_queued: int = 16               # POST /jobs answers 503 beyond this
+    retention_minutes: int = 30        # Finished jobs can be fetched this long
+    max_finished: int = 64             # Finished jobs kept at most
+
+
+@dataclass(frozen=True)
+class HistoryConfig:
+    """On-disk archive of generations and their renders."""
+    enabled: bool = True
+    max_size_mb: int = 1024            # Oldest generations are evicted beyond this
+    max_age_days: int = 90             # Generations older than this are evicted
+
+
+@dataclass(frozen=True)
+class WarmStartConfig:
+    """Restoring caches from disk when the server starts."""
+    enabled: bool = True
+    max_profiles: int = 8              # Newest render restored for this many profiles
+    render_processes: int = 1          # Render processes started at boot; others start on use
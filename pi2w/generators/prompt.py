@@ -64,7 +64,7 @@ class ArtPromptGenerator:
         self._llm = llm
         self._display_config = display_config
     
-    def generate(
+    async def generate(
         self,
         time_of_day: TimeOfDay,
         style: str | None = None,
@@ -78,7 +78,7 @@ class ArtPromptGenerator:
         """
         # 10% chance to go full AI creative mode
         if random.random() < 0.1:
-            return self._generate_ai_unleashed(time_of_day)
+            return await self._generate_ai_unleashed(time_of_day)
 
         artist = None
         if use_artist_of_day and style is None:
@@ -88,7 +88,7 @@ class ArtPromptGenerator:
 
         style_hint = f" {style}" if style else ""
 
-        base_prompt = self._llm.generate_text(
+        base_prompt = await self._llm.generate_text(
             system_prompt=self.SYSTEM_PROMPT,
             user_prompt=f"Create a stunning {time_of_day.value} scene{style_hint}. Make it vibrant and visually striking.",
             max_tokens=150,
@@ -97,11 +97,11 @@ class ArtPromptGenerator:
 
         return self._build_full_prompt(base_prompt), artist
 
-    def _generate_ai_unleashed(self, time_of_day: TimeOfDay) -> tuple[str, Artist]:
+    async def _generate_ai_unleashed(self, time_of_day: TimeOfDay) -> tuple[str, Artist]:
         """Generate a truly AI-creative prompt that humans couldn't imagine."""
         concept = random.choice(AI_UNLEASHED_CONCEPTS)
 
-        base_prompt = self._llm.generate_text(
+        base_prompt = await self._llm.generate_text(
             system_prompt=self.AI_UNLEASHED_SYSTEM_PROMPT,
             user_prompt=(
                 f"Create art based on this impossible concept: {concept}. "
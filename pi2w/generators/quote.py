@@ -21,10 +21,10 @@ class QuoteGenerator:
         self._llm = llm
         self._config = config
     
-    def generate(self) -> str:
+    async def generate(self) -> str:
         """Generate a random inspirational quote."""
         theme = random.choice(self._config.themes)
-        result = self._llm.generate_text(
+        result = await self._llm.generate_text(
             system_prompt=self.SYSTEM_PROMPT,
             user_prompt=f"Generate an original quote about {theme}.",
             max_tokens=50,
@@ -1,7 +1,10 @@
 """Image processing package."""
 
-from .analyzer import ImageAnalyzer
+from .analyzer import ImageAnalyzer, RegionStats
 from .quantizer import ImageQuantizer
-from .text import FontLoader, TextRenderer, TextWrapper
+from .text import FontLoader, TextMeasurer, TextRenderer, TextWrapper, load_font
 
-__all__ = ["ImageAnalyzer", "ImageQuantizer", "FontLoader", "TextRenderer", "TextWrapper"]
+__all__ = [
+    "ImageAnalyzer", "ImageQuantizer", "RegionStats", "FontLoader", "TextMeasurer",
+    "TextRenderer", "TextWrapper", "load_font",
+]
@@ -1,13 +1,97 @@
 """Image analysis utilities."""
 
-from PIL import Image
+import math
+
+import numpy as np
+from PIL import Image, ImageStat
 
 from ..models import TextColors, TextPosition
 
 
+class RegionStats:
+    """Luminance mean and variance of any rectangle in constant time.
+
+    Summed-area tables of luminance and luminance squared are built once
+    per image. A region then costs four lookups per table, and a whole
+    grid of candidate regions is scored in one vectorized pass. Regions
+    are clipped to the image.
+
+    Images above ``max_pixels`` are box-averaged down first; coordinates
+    stay in the original image's pixels. Means are then exact to within
+    a block, and variance only counts detail coarser than a block.
+    """
+
+    def __init__(self, image: Image.Image, max_pixels: int = 250_000):
+        grayscale = image.convert("L")
+        self._scale = max(1, math.ceil(math.sqrt(grayscale.width * grayscale.height / max_pixels)))
+        if self._scale > 1:
+            grayscale = grayscale.reduce(self._scale)
+        luminance = np.asarray(grayscale, dtype=np.int64)
+        self._height, self._width = luminance.shape
+        self._sum = self._integral(luminance)
+        self._squares = self._integral(luminance * luminance)
+
+    def mean(self, position: TextPosition) -> float:
+        """Average luminance of a region, 0-255; 128 for an empty region."""
+        return self._region(position)[0]
+
+    def variance(self, position: TextPosition) -> float:
+        """Luminance variance of a region."""
+        return self._region(position)[1]
+
+    def grid(
+        self, xs: list[int] | np.ndarray, ys: list[int] | np.ndarray, width: int, height: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Means and variances of ``width`` x ``height`` regions at every (x, y).
+
+        Both arrays have shape ``(len(ys), len(xs))``.
+        """
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        x0 = np.clip(xs // self._scale, 0, self._width)[None, :]
+        x1 = np.clip((xs + width) // self._scale, 0, self._width)[None, :]
+        y0 = np.clip(ys // self._scale, 0, self._height)[:, None]
+        y1 = np.clip((ys + height) // self._scale, 0, self._height)[:, None]
+        area = (x1 - x0) * (y1 - y0)
+        safe_area = np.maximum(area, 1)
+        means = self._box(self._sum, x0, y0, x1, y1) / safe_area
+        variances = self._box(self._squares, x0, y0, x1, y1) / safe_area - means * means
+        means = np.where(area > 0, means, 128.0)
+        return means, np.maximum(variances, 0.0)
+
+    def _region(self, position: TextPosition) -> tuple[float, float]:
+        """Mean and variance of one region, on plain ints rather than arrays."""
+        scale = self._scale
+        x0 = min(max(position.x // scale, 0), self._width)
+        x1 = min(max((position.x + position.width) // scale, 0), self._width)
+        y0 = min(max(position.y // scale, 0), self._height)
+        y1 = min(max((position.y + position.height) // scale, 0), self._height)
+        area = (x1 - x0) * (y1 - y0)
+        if area <= 0:
+            return 128.0, 0.0
+        total = int(self._box(self._sum, x0, y0, x1, y1))
+        squares = int(self._box(self._squares, x0, y0, x1, y1))
+        mean = total / area
+        return mean, max(squares / area - mean * mean, 0.0)
+
+    @staticmethod
+    def _integral(values: np.ndarray) -> np.ndarray:
+        """Summed-area table with a zero first row and column."""
+        table = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.int64)
+        np.cumsum(values, axis=0, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+    @staticmethod
+    def _box(table: np.ndarray, x0, y0, x1, y1) -> np.ndarray:
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+
 class ImageAnalyzer:
     """Analyzes image properties."""
     
+    # Text is black on backgrounds brighter than this, white otherwise.
+    TEXT_BRIGHTNESS_THRESHOLD = 140
+    
     @staticmethod
     def get_region_brightness(image: Image.Image, position: TextPosition) -> float:
         """Analyze average brightness of a region. Returns 0-255."""
@@ -17,12 +101,14 @@ class ImageAnalyzer:
             position.x + position.width, 
             position.y + position.height
         ))
-        grayscale = region.convert("L")
-        pixels = list(grayscale.getdata())
-        return sum(pixels) / len(pixels) if pixels else 128
+        if region.width == 0 or region.height == 0:
+            return 128
+        return ImageStat.Stat(region.convert("L")).mean[0]
     
     @staticmethod
-    def get_optimal_text_colors(brightness: float, threshold: float = 140) -> TextColors:
+    def get_optimal_text_colors(
+        brightness: float, threshold: float = TEXT_BRIGHTNESS_THRESHOLD
+    ) -> TextColors:
         """Determine best text colors based on background brightness."""
         if brightness > threshold:
             return TextColors(text=(0, 0, 0), shadow=(255, 255, 255))
@@ -0,0 +1,248 @@
+"""Vectorized dithering engines.
+
+Error diffusion is inherently sequential. Pixels are processed along
+skewed anti-diagonals: with skew ``s`` every pixel ``(y, x)`` with
+``x + s * y == t`` only depends on pixels from earlier steps, so each step
+quantizes a whole wavefront with a handful of NumPy operations instead of
+one Python iteration per pixel.
+
+All arithmetic is done in fixed-point integers, which makes the result
+independent of the order in which errors are accumulated.
+
+Ordered dithering adds a tiled threshold matrix (Bayer or blue noise) to
+the image and maps it through the palette table in a single pass.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache
+
+import numpy as np
+
+from .palette import PaletteLUT
+
+FRACTION_BITS = 8
+SCALE = 1 << FRACTION_BITS
+MAX_VALUE = 255 * SCALE
+
+
+@dataclass(frozen=True)
+class DiffusionKernel:
+    """Error distribution weights as (dy, dx, weight) over a common divisor."""
+    divisor: int
+    weights: tuple[tuple[int, int, int], ...]
+
+    @property
+    def reach(self) -> int:
+        """Largest horizontal or vertical distance errors travel."""
+        return max(max(abs(dx), dy) for dy, dx, _ in self.weights)
+
+    @property
+    def skew(self) -> int:
+        """Smallest wavefront skew that respects every dependency."""
+        return max(
+            [1] + [(-dx) // dy + 1 for dy, dx, _ in self.weights if dy > 0 and dx < 0]
+        )
+
+
+KERNELS: dict[str, DiffusionKernel] = {
+    "floyd-steinberg": DiffusionKernel(16, (
+        (0, 1, 7),
+        (1, -1, 3), (1, 0, 5), (1, 1, 1),
+    )),
+    "atkinson": DiffusionKernel(8, (
+        (0, 1, 1), (0, 2, 1),
+        (1, -1, 1), (1, 0, 1), (1, 1, 1),
+        (2, 0, 1),
+    )),
+    "jarvis": DiffusionKernel(48, (
+        (0, 1, 7), (0, 2, 5),
+        (1, -2, 3), (1, -1, 5), (1, 0, 7), (1, 1, 5), (1, 2, 3),
+        (2, -2, 1), (2, -1, 3), (2, 0, 5), (2, 1, 3), (2, 2, 1),
+    )),
+    "stucki": DiffusionKernel(42, (
+        (0, 1, 8), (0, 2, 4),
+        (1, -2, 2), (1, -1, 4), (1, 0, 8), (1, 1, 4), (1, 2, 2),
+        (2, -2, 1), (2, -1, 2), (2, 0, 4), (2, 1, 2), (2, 2, 1),
+    )),
+}
+
+
+def diffuse_wavefront(
+    buf: np.ndarray,
+    out: np.ndarray,
+    kernel: DiffusionKernel,
+    lut: PaletteLUT,
+    incoming: np.ndarray | None = None,
+    first_row: int = 0,
+    wait: Callable[[int], None] | None = None,
+    publish: Callable[[int], None] | None = None,
+) -> None:
+    """Diffuse a band of rows along skewed anti-diagonals.
+
+    ``buf`` holds the band's fixed-point pixels padded by ``kernel.reach``
+    columns on each side, followed by ``kernel.reach`` rows that collect
+    the error spilling into the next band. ``incoming`` is the previous
+    band's spill area; before a step touches those rows, ``wait(t)`` must
+    block until the previous band has finished every global step below
+    ``t``. ``publish(t)`` is called after each global step completes.
+    A single band covering the whole image needs none of these.
+    """
+    height, width = out.shape
+    pad = kernel.reach
+    skew = kernel.skew
+    stride = width + 2 * pad
+    flat_buf = buf.reshape(-1, 3)
+    flat_incoming = incoming.reshape(-1, 3) if incoming is not None else None
+    flat_out = out.reshape(-1)
+    palette = lut.palette.astype(np.int32) * SCALE
+
+    # Flat positions of the wavefront pixels are base + t for rows in range.
+    rows = np.arange(height)
+    base = rows * (stride - skew) + pad
+    out_base = rows * (width - skew)
+    half = kernel.divisor // 2
+    offsets: dict[int, list[int]] = {}
+    for dy, dx, weight in kernel.weights:
+        offsets.setdefault(weight, []).append(dy * stride + dx)
+
+    for t in range(width + skew * (height - 1)):
+        y_first = max(0, -((width - 1 - t) // skew))
+        y_last = min(height - 1, t // skew) + 1
+        positions = base[y_first:y_last] + t
+
+        if flat_incoming is not None and y_first < pad:
+            if wait is not None:
+                wait(t + skew * first_row)
+            carried = positions[:min(y_last, pad) - y_first]
+            flat_buf[carried] += flat_incoming[carried]
+
+        values = np.minimum(np.maximum(flat_buf[positions], 0), MAX_VALUE)
+        indices = lut.lookup(values, FRACTION_BITS)
+        flat_out[out_base[y_first:y_last] + t] = indices
+        error = values - palette[indices]
+        for weight, targets in offsets.items():
+            share = (error * weight + half) // kernel.divisor
+            for offset in targets:
+                flat_buf[positions + offset] += share
+
+        if publish is not None:
+            publish(t + skew * first_row + 1)
+
+
+class ErrorDiffusionDitherer:
+    """Dithers RGB arrays to palette indices with an error-diffusion kernel."""
+
+    def __init__(self, lut: PaletteLUT, method: str = "floyd-steinberg"):
+        if method not in KERNELS:
+            raise ValueError(f"Unknown dithering method: {method}")
+        self._kernel = KERNELS[method]
+        self._lut = lut
+
+    def dither(self, rgb: np.ndarray) -> np.ndarray:
+        """Dither an HxWx3 uint8 array. Returns an HxW uint8 index array."""
+        height, width = rgb.shape[:2]
+        pad = self._kernel.reach
+        buf = np.zeros((height + pad, width + 2 * pad, 3), dtype=np.int32)
+        buf[:height, pad:pad + width] = rgb.astype(np.int32) * SCALE
+        out = np.empty((height, width), dtype=np.uint8)
+        diffuse_wavefront(buf, out, self._kernel, self._lut)
+        return out
+
+
+@cache
+def bayer_matrix(size: int) -> np.ndarray:
+    """Normalized Bayer threshold matrix in (0, 1) for a power-of-two size."""
+    matrix = np.zeros((1, 1), dtype=np.int32)
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return (matrix + 0.5) / matrix.size
+
+
+@cache
+def blue_noise_matrix(size: int = 64, sigma: float = 1.5, seed: int = 0) -> np.ndarray:
+    """Normalized blue-noise threshold matrix from the void-and-cluster method.
+
+    Computed once per process; the result is deterministic for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    freq = np.fft.fftfreq(size)
+    gaussian = np.exp(-2 * (np.pi * sigma) ** 2 * (freq[:, None] ** 2 + freq[None, :] ** 2))
+
+    def energy(pattern: np.ndarray) -> np.ndarray:
+        return np.real(np.fft.ifft2(np.fft.fft2(pattern) * gaussian))
+
+    def tightest_cluster(pattern: np.ndarray) -> int:
+        return int(np.argmax(np.where(pattern, energy(pattern), -np.inf)))
+
+    def largest_void(pattern: np.ndarray) -> int:
+        return int(np.argmin(np.where(pattern, np.inf, energy(pattern))))
+
+    # Relax a random ~10% pattern until it is evenly spread.
+    pattern = (rng.random((size, size)) < 0.1).ravel()
+    while True:
+        cluster = tightest_cluster(pattern.reshape(size, size))
+        pattern[cluster] = False
+        void = largest_void(pattern.reshape(size, size))
+        pattern[void] = True
+        if void == cluster:
+            break
+
+    ranks = np.zeros(size * size, dtype=np.int32)
+    initial = int(pattern.sum())
+
+    removing = pattern.copy()
+    for rank in range(initial - 1, -1, -1):
+        index = tightest_cluster(removing.reshape(size, size))
+        removing[index] = False
+        ranks[index] = rank
+
+    adding = pattern.copy()
+    for rank in range(initial, size * size):
+        index = largest_void(adding.reshape(size, size))
+        adding[index] = True
+        ranks[index] = rank
+
+    return ((ranks + 0.5) / ranks.size).reshape(size, size)
+
+
+THRESHOLD_MATRICES = {
+    "bayer4": lambda: bayer_matrix(4),
+    "bayer8": lambda: bayer_matrix(8),
+    "blue-noise": blue_noise_matrix,
+}
+
+
+class OrderedDitherer:
+    """Dithers RGB arrays to palette indices with a tiled threshold matrix.
+
+    Every pixel is independent, so the whole image is a single vectorized
+    pass regardless of size.
+    """
+
+    SPREAD = 128  # Threshold amplitude in 8-bit levels
+    CHUNK_ROWS = 256  # Bounds temporary memory on very large images
+
+    def __init__(self, lut: PaletteLUT, method: str = "bayer8"):
+        if method not in THRESHOLD_MATRICES:
+            raise ValueError(f"Unknown dithering method: {method}")
+        self._lut = lut
+        matrix = THRESHOLD_MATRICES[method]()
+        self._threshold = np.round((matrix - 0.5) * self.SPREAD).astype(np.int16)
+
+    def dither(self, rgb: np.ndarray) -> np.ndarray:
+        """Dither an HxWx3 uint8 array. Returns an HxW uint8 index array."""
+        height, width = rgb.shape[:2]
+        rows, cols = self._threshold.shape
+        chunk = self.CHUNK_ROWS - self.CHUNK_ROWS % rows
+        offset = np.tile(self._threshold, (chunk // rows, -(-width // cols)))[:, :width, None]
+        out = np.empty((height, width), dtype=np.uint8)
+        for top in range(0, height, chunk):
+            values = rgb[top:top + chunk].astype(np.int16)
+            values += offset[:values.shape[0]]
+            np.clip(values, 0, 255, out=values)
+            out[top:top + chunk] = self._lut.lookup(values)
+        return out
+
+
+DITHER_METHODS = ("none", *KERNELS, *THRESHOLD_MATRICES)
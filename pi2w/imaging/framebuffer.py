@@ -0,0 +1,75 @@
+"""Packed e-ink framebuffers in the panels' native color order."""
+
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from ..config import get_palette
+
+# Panel color index for each entry of PALETTES[num_colors], matching the
+# Inky drivers' color constants.
+PANEL_INDICES = {
+    2: (1, 0),                   # pHAT/wHAT: WHITE 0, BLACK 1
+    3: (1, 0, 2),                # pHAT/wHAT: WHITE 0, BLACK 1, RED/YELLOW 2
+    6: (0, 1, 3, 2, 6, 5),       # Spectra 6 (E673): BLACK 0, WHITE 1, YELLOW 2, RED 3, BLUE 5, GREEN 6
+    7: (0, 1, 4, 5, 2, 3, 6),    # 7-color ACeP: BLACK 0, WHITE 1, GREEN 2, BLUE 3, RED 4, YELLOW 5, ORANGE 6
+}
+
+PANEL_NAMES = {2: "inky-mono", 3: "inky-tricolor", 6: "spectra6", 7: "acep7"}
+
+
+@dataclass
+class Framebuffer:
+    """Panel indices packed MSB-first, row-major, ``8 // bits`` pixels per byte."""
+    data: bytes
+    width: int
+    height: int
+    bits: int
+    panel: str
+    palette: dict[int, tuple[int, int, int]]
+
+    def headers(self) -> dict[str, str]:
+        """Layout and palette as response headers."""
+        return {
+            "X-Width": str(self.width),
+            "X-Height": str(self.height),
+            "X-Bits-Per-Pixel": str(self.bits),
+            "X-Panel": self.panel,
+            "X-Palette": ",".join(
+                f"{index}:{r:02x}{g:02x}{b:02x}"
+                for index, (r, g, b) in sorted(self.palette.items())
+            ),
+        }
+
+
+def pack_framebuffer(image: Image.Image, num_colors: int) -> Framebuffer:
+    """Pack a paletted image from ImageQuantizer into the panel's layout.
+
+    Panels with more than four colors get 4 bits per pixel (two pixels per
+    byte, the first in the high nibble, as Inky sends them); the others 2.
+    """
+    if image.mode != "P":
+        raise ValueError(f"expected a paletted image, got mode {image.mode}")
+    panel_indices = PANEL_INDICES[num_colors]
+    bits = 4 if num_colors > 4 else 2
+    per_byte = 8 // bits
+
+    lookup = np.zeros(256, dtype=np.uint8)
+    lookup[:num_colors] = panel_indices
+    indices = lookup[np.asarray(image)].ravel()
+    padded = np.zeros(-(-indices.size // per_byte) * per_byte, dtype=np.uint8)
+    padded[:indices.size] = indices
+
+    groups = padded.reshape(-1, per_byte)
+    shifts = np.arange(per_byte - 1, -1, -1, dtype=np.uint8) * bits
+    packed = np.bitwise_or.reduce(groups << shifts, axis=1).astype(np.uint8)
+
+    return Framebuffer(
+        data=packed.tobytes(),
+        width=image.width,
+        height=image.height,
+        bits=bits,
+        panel=PANEL_NAMES[num_colors],
+        palette=dict(zip(panel_indices, get_palette(num_colors), strict=True)),
+    )
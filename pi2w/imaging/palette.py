@@ -0,0 +1,97 @@
+"""Precomputed nearest-color lookup tables for display palettes."""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import ClassVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PaletteLUT:
+    """3D RGB lookup table mapping quantized colors to palette indices.
+
+    Each channel is reduced to ``bits`` bits, so nearest-color search
+    becomes a single indexed gather into a ``2 ** (3 * bits)`` table.
+    """
+
+    _loaded: ClassVar[dict[tuple, "PaletteLUT"]] = {}
+
+    def __init__(self, palette_rgb: list[tuple[int, int, int]], bits: int, table: np.ndarray):
+        self.palette = np.array(palette_rgb, dtype=np.uint8)
+        self.bits = bits
+        self.table = table
+
+    @classmethod
+    def compile(cls, palette_rgb: list[tuple[int, int, int]], bits: int = 6) -> "PaletteLUT":
+        """Build the table by matching every bin center to its nearest color."""
+        shift = 8 - bits
+        centers = (np.arange(1 << bits, dtype=np.int32) << shift) + ((1 << shift) >> 1)
+        r, g, b = np.meshgrid(centers, centers, centers, indexing="ij")
+        best = np.full(r.shape, np.iinfo(np.int32).max, dtype=np.int32)
+        table = np.zeros(r.shape, dtype=np.uint8)
+        for index, (pr, pg, pb) in enumerate(palette_rgb):
+            distance = (r - pr) ** 2 + (g - pg) ** 2 + (b - pb) ** 2
+            closer = distance < best
+            best[closer] = distance[closer]
+            table[closer] = index
+        return cls(palette_rgb, bits, table.ravel())
+
+    @classmethod
+    def load(
+        cls,
+        palette_rgb: list[tuple[int, int, int]],
+        bits: int = 6,
+        cache_dir: Path | None = None,
+    ) -> "PaletteLUT":
+        """Get the table for a palette, compiling it at most once per process.
+
+        When ``cache_dir`` is given, compiled tables are saved there and
+        loaded on later starts instead of being rebuilt.
+        """
+        key = (tuple(tuple(c) for c in palette_rgb), bits)
+        lut = cls._loaded.get(key)
+        if lut is not None:
+            return lut
+
+        path = cache_dir / f"lut-{cls._digest(key)}.npy" if cache_dir else None
+        if path is not None and path.exists():
+            try:
+                table = np.load(path)
+                if table.shape == (1 << (3 * bits),):
+                    lut = cls(palette_rgb, bits, table)
+            except (OSError, ValueError):
+                logger.warning("Ignoring unreadable palette table %s", path)
+
+        if lut is None:
+            lut = cls.compile(palette_rgb, bits)
+            if path is not None:
+                lut._save(path)
+
+        cls._loaded[key] = lut
+        return lut
+
+    def lookup(self, values: np.ndarray, fraction_bits: int = 0) -> np.ndarray:
+        """Palette indices for ...x3 integer colors in [0, 255 << fraction_bits]."""
+        shift = 8 - self.bits + fraction_bits
+        bins = values.astype(np.int32, copy=False) >> shift
+        flat = (bins[..., 0] << (2 * self.bits)) | (bins[..., 1] << self.bits) | bins[..., 2]
+        return self.table[flat]
+
+    def _save(self, path: Path) -> None:
+        """Write the table atomically so concurrent workers never see a partial file."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, self.table)
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("Could not save palette table to %s", path)
+
+    @staticmethod
+    def _digest(key: tuple) -> str:
+        return hashlib.sha256(repr(key).encode()).hexdigest()[:16]
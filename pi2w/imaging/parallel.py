@@ -0,0 +1,193 @@
+"""Multi-process error diffusion over shared memory.
+
+The image is split into horizontal bands, one per worker. Every band runs
+the same anti-diagonal schedule as the sequential engine, offset by its
+first row, and writes the error that spills past its last row into its
+own carry rows. The band below adds that carry when its wavefront reaches
+those rows, after waiting for the band above to publish that it has
+finished every earlier step. Integer arithmetic makes the result
+bit-identical to the single-process engine.
+
+Bands publish progress every ``SYNC_STEPS`` steps. A band that catches up
+with the one above sleeps until that band is a whole batch ahead, then runs
+the batch without checking again, so a waiting band leaves its core to the
+others instead of spinning.
+"""
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import pairwise
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .dither import KERNELS, SCALE, diffuse_wavefront
+from .palette import PaletteLUT
+
+logger = logging.getLogger(__name__)
+
+DONE = np.iinfo(np.int64).max
+SYNC_STEPS = 16
+POLL_SECONDS = 0.0002
+
+
+@dataclass(frozen=True)
+class _BandJob:
+    """Everything a worker needs to diffuse one band."""
+    index: int
+    bands: int
+    first_row: int
+    last_row: int
+    height: int
+    width: int
+    method: str
+    palette: tuple[tuple[int, int, int], ...]
+    lut_bits: int
+    image_name: str
+    buffer_name: str
+    output_name: str
+    progress_name: str
+
+
+def _dither_band(job: _BandJob) -> None:
+    """Worker: diffuse rows [first_row, last_row) of the shared image."""
+    kernel = KERNELS[job.method]
+    pad = kernel.reach
+    stride = job.width + 2 * pad
+    blocks = [
+        shared_memory.SharedMemory(name=name)
+        for name in (job.image_name, job.buffer_name, job.output_name, job.progress_name)
+    ]
+    progress = np.ndarray((job.bands,), np.int64, blocks[3].buf)
+    try:
+        image = np.ndarray((job.height, job.width, 3), np.uint8, blocks[0].buf)
+        buffers = np.ndarray((job.height + job.bands * pad, stride, 3), np.int32, blocks[1].buf)
+        output = np.ndarray((job.height, job.width), np.uint8, blocks[2].buf)
+
+        # Band k's block starts k * pad rows further down, leaving room for
+        # the carry rows of every band above it.
+        top = job.first_row + job.index * pad
+        rows = job.last_row - job.first_row
+        band = buffers[top:top + rows + pad]
+        band[:] = 0
+        band[:rows, pad:pad + job.width] = image[job.first_row:job.last_row].astype(np.int32) * SCALE
+
+        incoming = None
+        wait = None
+        if job.index > 0:
+            incoming = buffers[top - pad:top]
+            above = job.index - 1
+            finished = 0  # Steps the band above is known to have finished
+
+            def wait(step: int) -> None:
+                nonlocal finished
+                if step <= finished:
+                    return
+                while (finished := int(progress[above])) < step + SYNC_STEPS:
+                    time.sleep(POLL_SECONDS)
+
+        def publish(step: int) -> None:
+            # The last partial batch is covered by DONE below.
+            if step % SYNC_STEPS == 0:
+                progress[job.index] = step
+
+        lut = PaletteLUT.load(list(job.palette), job.lut_bits)
+        diffuse_wavefront(
+            band, output[job.first_row:job.last_row], kernel, lut,
+            incoming=incoming, first_row=job.first_row, wait=wait, publish=publish,
+        )
+    finally:
+        # Also release the band below if this one failed; the parent
+        # raises the failure and discards the output.
+        progress[job.index] = DONE
+        progress = None
+        for block in blocks:
+            block.close()
+
+
+class ParallelDiffusion:
+    """Runs raster error diffusion across a pool of worker processes.
+
+    Bands only ever wait on the band above, and jobs are queued in band
+    order, so the lowest unfinished band is always running and the pool
+    cannot deadlock even when it has fewer workers than bands.
+    """
+
+    def __init__(self, workers: int, min_pixels: int):
+        self._workers = workers
+        self._min_pixels = min_pixels
+        self._executor: ProcessPoolExecutor | None = None
+
+    def should_use(self, width: int, height: int) -> bool:
+        """Whether an image is large enough to be worth splitting."""
+        return self._workers > 1 and width * height >= self._min_pixels
+
+    def dither(self, rgb: np.ndarray, lut: PaletteLUT, method: str) -> np.ndarray:
+        """Dither an HxWx3 uint8 array. Returns an HxW uint8 index array."""
+        height, width = rgb.shape[:2]
+        kernel = KERNELS[method]
+        pad = kernel.reach
+        bands = self._band_rows(height, pad)
+        stride = width + 2 * pad
+
+        sizes = (
+            rgb.nbytes,
+            (height + len(bands) * pad) * stride * 3 * 4,
+            height * width,
+            len(bands) * 8,
+        )
+        blocks = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        try:
+            np.ndarray(rgb.shape, np.uint8, blocks[0].buf)[:] = rgb
+            np.ndarray((len(bands),), np.int64, blocks[3].buf)[:] = -1
+
+            palette = tuple(tuple(int(c) for c in color) for color in lut.palette)
+            jobs = [
+                _BandJob(
+                    index=index,
+                    bands=len(bands),
+                    first_row=first,
+                    last_row=last,
+                    height=height,
+                    width=width,
+                    method=method,
+                    palette=palette,
+                    lut_bits=lut.bits,
+                    image_name=blocks[0].name,
+                    buffer_name=blocks[1].name,
+                    output_name=blocks[2].name,
+                    progress_name=blocks[3].name,
+                )
+                for index, (first, last) in enumerate(bands)
+            ]
+            for future in [self._pool().submit(_dither_band, job) for job in jobs]:
+                future.result()
+            return np.ndarray((height, width), np.uint8, blocks[2].buf).copy()
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def close(self) -> None:
+        """Shut the worker pool down."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Started %d dithering workers", self._workers)
+        return self._executor
+
+    def _band_rows(self, height: int, min_rows: int) -> list[tuple[int, int]]:
+        """Split rows into at most one band per worker, each at least min_rows tall."""
+        bands = max(1, min(self._workers, height // max(min_rows, 1)))
+        edges = np.linspace(0, height, bands + 1).astype(int)
+        return [(int(a), int(b)) for a, b in pairwise(edges)]
@@ -1,30 +1,42 @@
 """Image quantization for e-ink display."""
 
-import hitherdither
+from pathlib import Path
+
+import numpy as np
 from PIL import Image, ImageEnhance
 
 from ..config import DisplayConfig
+from .dither import KERNELS, ErrorDiffusionDitherer, OrderedDitherer
+from .palette import PaletteLUT
+from .parallel import ParallelDiffusion
 
 
 class ImageQuantizer:
-    """Quantizes images to display palette using hitherdither."""
+    """Quantizes images to display palette with error-diffusion or ordered dithering."""
     
     SATURATION_BOOST = 1.4
+    LUT_BITS = 6
     
-    def __init__(self, config: DisplayConfig):
+    def __init__(
+        self,
+        config: DisplayConfig,
+        lut_cache_dir: Path | None = None,
+        parallel: ParallelDiffusion | None = None,
+    ):
         self._config = config
-        self._palette = self._create_palette()
-    
-    def _create_palette(self) -> hitherdither.palette.Palette:
-        """Create hitherdither palette from config."""
-        hex_colors = [
-            (r << 16) | (g << 8) | b 
-            for r, g, b in self._config.palette_rgb
-        ]
-        return hitherdither.palette.Palette(hex_colors)
+        self._parallel = parallel
+        self._lut = PaletteLUT.load(config.palette_rgb, self.LUT_BITS, lut_cache_dir)
+        self._ditherer: ErrorDiffusionDitherer | OrderedDitherer | None = None
+        if config.dither in KERNELS:
+            self._ditherer = ErrorDiffusionDitherer(self._lut, method=config.dither)
+        elif config.dither != "none":
+            self._ditherer = OrderedDitherer(self._lut, method=config.dither)
     
     def quantize(self, image: Image.Image) -> Image.Image:
-        """Quantize image to display palette with Floyd-Steinberg dithering."""
+        """Quantize image to display palette using the configured dithering.
+        
+        Returns a "P" image whose palette holds exactly the display colors.
+        """
         if image.mode != "RGB":
             image = image.convert("RGB")
         
@@ -36,8 +48,22 @@ class ImageQuantizer:
         enhancer = ImageEnhance.Color(image)
         image = enhancer.enhance(self.SATURATION_BOOST)
         
-        dithered = hitherdither.diffusion.error_diffusion_dithering(
-            image, self._palette, method="floyd-steinberg", order=2
-        )
+        pixels = np.asarray(image)
+        if self._ditherer is None:
+            indices = self._lut.lookup(pixels)
+        elif self._use_parallel():
+            indices = self._parallel.dither(pixels, self._lut, self._config.dither)
+        else:
+            indices = self._ditherer.dither(pixels)
         
-        return dithered.convert("RGB")
+        paletted = Image.fromarray(indices, "P")
+        paletted.putpalette(self._lut.palette.tobytes())
+        return paletted
+    
+    def _use_parallel(self) -> bool:
+        """Raster error diffusion on large images is split across processes."""
+        return (
+            self._parallel is not None
+            and isinstance(self._ditherer, ErrorDiffusionDitherer)
+            and self._parallel.should_use(self._config.width, self._config.height)
+        )
@@ -1,10 +1,49 @@
 """Text rendering utilities."""
 
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 from ..config import FontConfig
 from ..models import TextColors, TextPosition
 
+# Fonts opened in this process by (path, size), least recently used first;
+# None marks a path that failed to load, so it is not probed again.
+_FONT_CACHE_SIZE = 64
+_fonts: OrderedDict[tuple[str, int], ImageFont.FreeTypeFont | None] = OrderedDict()
+_default_font: ImageFont.FreeTypeFont | ImageFont.ImageFont | None = None
+_fonts_lock = threading.Lock()
+
+
+def load_font(paths: Iterable[str], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """First of ``paths`` that loads at ``size``, or Pillow's default font.
+    
+    Each (path, size) is opened once and shared while it stays among the
+    ``_FONT_CACHE_SIZE`` most recently used.
+    """
+    global _default_font
+    with _fonts_lock:
+        for path in paths:
+            key = (path, size)
+            if key in _fonts:
+                _fonts.move_to_end(key)
+            else:
+                try:
+                    _fonts[key] = ImageFont.truetype(path, size)
+                except OSError:
+                    _fonts[key] = None
+                while len(_fonts) > _FONT_CACHE_SIZE:
+                    _fonts.popitem(last=False)
+            if _fonts[key] is not None:
+                return _fonts[key]
+        if _default_font is None:
+            _default_font = ImageFont.load_default()
+        return _default_font
+
 
 class FontLoader:
     """Loads fonts with fallback support."""
@@ -14,46 +53,190 @@ class FontLoader:
     
     def load(self) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
         """Load font with fallback chain."""
-        for font_path in self._config.paths:
-            try:
-                return ImageFont.truetype(font_path, self._config.size)
-            except (OSError, IOError):
+        return load_font(self._config.paths, self._config.size)
+
+
+class TextMeasurer:
+    """Advance widths of text in one font, built from cached word widths.
+    
+    A line's width is the sum of its words and spaces plus the kerning
+    where each space meets a word, so growing a line by a word costs a
+    few dictionary lookups instead of measuring the whole line again.
+    """
+    
+    CACHE_SIZE = 1024  # Words and kerning pairs remembered per font
+    
+    def __init__(self, font: ImageFont.FreeTypeFont | ImageFont.ImageFont):
+        self._font = font
+        self._widths: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._space = self.width(" ")
+    
+    def width(self, text: str) -> float:
+        """Advance width of a string, cached."""
+        with self._lock:
+            width = self._widths.get(text)
+            if width is not None:
+                self._widths.move_to_end(text)
+                return width
+        width = self._font.getlength(text)
+        with self._lock:
+            self._widths[text] = width
+            while len(self._widths) > self.CACHE_SIZE:
+                self._widths.popitem(last=False)
+        return width
+    
+    def join(self, line_width: float, last: str, word: str) -> float:
+        """Width of a line ending in ``last`` once `` word`` is appended to it."""
+        return (
+            line_width + self._space + self.width(word)
+            + self._kerning(last[-1], " ") + self._kerning(" ", word[0])
+        )
+    
+    def wrap(self, text: str, max_width: float) -> list[tuple[str, float]]:
+        """Greedy word wrap; returns each line with its width."""
+        lines = []
+        current: list[str] = []
+        current_width = 0.0
+        
+        for word in text.split():
+            if not current:
+                current, current_width = [word], self.width(word)
                 continue
-        return ImageFont.load_default()
+            width = self.join(current_width, current[-1], word)
+            if width <= max_width:
+                current.append(word)
+                current_width = width
+            else:
+                lines.append((" ".join(current), current_width))
+                current, current_width = [word], self.width(word)
+        
+        if current:
+            lines.append((" ".join(current), current_width))
+        return lines
+    
+    def _kerning(self, left: str, right: str) -> float:
+        return self.width(left + right) - self.width(left) - self.width(right)
+
+
+# One measurer per font, so word widths are shared by every wrapper; as
+# many as there are cached fonts, least recently used first.
+_measurers: OrderedDict[ImageFont.FreeTypeFont | ImageFont.ImageFont, TextMeasurer] = (
+    OrderedDict()
+)
+_measurers_lock = threading.Lock()
+
+
+def measurer(font: ImageFont.FreeTypeFont | ImageFont.ImageFont) -> TextMeasurer:
+    """The shared measurer for a font."""
+    with _measurers_lock:
+        text_measurer = _measurers.get(font)
+        if text_measurer is not None:
+            _measurers.move_to_end(font)
+            return text_measurer
+        text_measurer = _measurers[font] = TextMeasurer(font)
+        while len(_measurers) > _FONT_CACHE_SIZE:
+            _measurers.popitem(last=False)
+        return text_measurer
 
 
 class TextWrapper:
     """Wraps text to fit within width constraints."""
     
     def __init__(self, font: ImageFont.FreeTypeFont | ImageFont.ImageFont, max_width: int):
-        self._font = font
+        self._measurer = measurer(font)
         self._max_width = max_width
-        self._draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
     
     def wrap(self, text: str) -> list[str]:
         """Wrap text into lines that fit within max_width."""
-        words = text.split()
-        lines = []
-        current_line: list[str] = []
-        
-        for word in words:
-            test_line = " ".join(current_line + [word])
-            bbox = self._draw.textbbox((0, 0), test_line, font=self._font)
-            if bbox[2] - bbox[0] <= self._max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(" ".join(current_line))
-                current_line = [word]
-        
-        if current_line:
-            lines.append(" ".join(current_line))
-        
-        return lines
+        return [line for line, _ in self._measurer.wrap(text, self._max_width)]
+
+
+@dataclass(frozen=True)
+class _TextLayer:
+    """A line of text with its shadow, ready to paste in one step.
+    
+    ``origin`` is where the text's drawing position falls in the layer,
+    and ``width`` the width of the text's bounding box.
+    """
+    color: Image.Image
+    alpha: Image.Image
+    origin: tuple[int, int]
+    width: int
+
+
+# Rendered lines, least recently used first. Fonts are loaded once per
+# path and size, so the font object identifies both. Render threads share
+# it, hence the lock.
+_LAYER_CACHE_SIZE = 32
+_layers: OrderedDict[tuple, _TextLayer] = OrderedDict()
+_layers_lock = threading.Lock()
+
+
+def _text_layer(
+    font: ImageFont.FreeTypeFont | ImageFont.ImageFont,
+    text: str,
+    colors: TextColors,
+    shadow_offsets: tuple[tuple[int, int], ...],
+) -> _TextLayer:
+    """Rasterize a line once and build its shadow from shifted copies of it."""
+    key = (font, text, colors.text, colors.shadow, shadow_offsets)
+    with _layers_lock:
+        layer = _layers.get(key)
+        if layer is not None:
+            _layers.move_to_end(key)
+            return layer
+    
+    pad = max((max(abs(dx), abs(dy)) for dx, dy in shadow_offsets), default=0)
+    left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox(
+        (0, 0), text, font=font
+    )
+    canvas = Image.new("L", (right - left + 2 * pad, bottom - top + 2 * pad))
+    origin = (pad - left, pad - top)
+    ImageDraw.Draw(canvas).text(origin, text, fill=255, font=font)
+    coverage = np.asarray(canvas, dtype=np.float32) / 255
+    
+    # Drawing the text at each offset compounds: every copy lets through
+    # (1 - coverage) of what was below it.
+    clear = np.ones_like(coverage)
+    height, width = coverage.shape
+    for dx, dy in shadow_offsets:
+        clear[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] *= (
+            1 - coverage[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)]
+        )
+    shadow = 1 - clear
+    
+    # Text over shadow, folded into a single color and alpha.
+    alpha = 1 - clear * (1 - coverage)
+    text_part = coverage[..., None]
+    shadow_part = (shadow * (1 - coverage))[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        color = (
+            np.asarray(colors.text, dtype=np.float32) * text_part
+            + np.asarray(colors.shadow, dtype=np.float32) * shadow_part
+        ) / alpha[..., None]
+    color = np.nan_to_num(color)
+    
+    layer = _TextLayer(
+        color=Image.fromarray(np.rint(color).astype(np.uint8), "RGB"),
+        alpha=Image.fromarray(np.rint(alpha * 255).astype(np.uint8), "L"),
+        origin=origin,
+        width=right - left,
+    )
+    with _layers_lock:
+        _layers[key] = layer
+        while len(_layers) > _LAYER_CACHE_SIZE:
+            _layers.popitem(last=False)
+    return layer
 
 
 class TextRenderer:
-    """Renders text onto images with shadow effect."""
+    """Renders text onto images with shadow effect.
+    
+    Each line is rasterized once. Its shadow is the union of the glyphs
+    at every offset, and shadow and text are composited into one cached
+    layer that is blended onto the image with a single paste.
+    """
     
     SHADOW_OFFSETS = (
         (-4, -4), (-4, 4), (4, -4), (4, 4),
@@ -69,20 +252,14 @@ class TextRenderer:
     def render(self, image: Image.Image, lines: list[str], 
                position: TextPosition, colors: TextColors) -> Image.Image:
         """Render text lines onto image."""
-        draw = ImageDraw.Draw(image)
         y_pos = position.y
         
         for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=self._font)
-            text_width = bbox[2] - bbox[0]
-            x = position.x + (position.width - text_width) // 2
-            
-            # Draw shadow
-            for ox, oy in self.SHADOW_OFFSETS:
-                draw.text((x + ox, y_pos + oy), line, fill=colors.shadow, font=self._font)
-            
-            # Draw text
-            draw.text((x, y_pos), line, fill=colors.text, font=self._font)
+            layer = _text_layer(self._font, line, colors, self.SHADOW_OFFSETS)
+            x = position.x + (position.width - layer.width) // 2
+            image.paste(
+                layer.color, (x - layer.origin[0], y_pos - layer.origin[1]), layer.alpha
+            )
             y_pos += self._line_height
         
         return image
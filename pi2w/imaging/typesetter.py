@@ -0,0 +1,85 @@
+"""Fitting quotes into a box at the largest font size that fits."""
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from PIL import ImageFont
+
+from ..config import FontConfig
+from .text import load_font, measurer
+
+
+@dataclass(frozen=True)
+class QuoteLayout:
+    """A quote wrapped and sized for a box."""
+    font: ImageFont.FreeTypeFont | ImageFont.ImageFont
+    size: int
+    lines: tuple[str, ...]
+    line_height: int
+    width: int
+    height: int
+
+
+# Layouts by (font config, quote, box), least recently used first, shared
+# by render threads.
+_LAYOUT_CACHE_SIZE = 256
+_layouts: OrderedDict[tuple, QuoteLayout] = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+class Typesetter:
+    """Picks the largest font size at which a quote fits a box.
+
+    Sizes are binary-searched between ``FontConfig.min_size`` and
+    ``max_size``. Each try wraps the quote from the cached word widths of
+    that size's font rather than rendering it. Line spacing scales with
+    the size, keeping the ratio of ``line_spacing`` to ``size``. A quote
+    that does not fit even at the smallest size is set at that size.
+    """
+
+    def __init__(self, config: FontConfig):
+        self._config = config
+
+    def fit(self, quote: str, box_width: int, box_height: int) -> QuoteLayout:
+        """Layout of the quote at the largest size fitting the box, memoized."""
+        key = (self._config, quote, box_width, box_height)
+        with _layouts_lock:
+            layout = _layouts.get(key)
+            if layout is not None:
+                _layouts.move_to_end(key)
+                return layout
+
+        low, high = self._config.min_size, max(self._config.min_size, self._config.max_size)
+        layout = self._layout(quote, low, box_width)
+        while low < high:
+            size = (low + high + 1) // 2
+            candidate = self._layout(quote, size, box_width)
+            if candidate.width <= box_width and candidate.height <= box_height:
+                layout, low = candidate, size
+            else:
+                high = size - 1
+
+        with _layouts_lock:
+            _layouts[key] = layout
+            while len(_layouts) > _LAYOUT_CACHE_SIZE:
+                _layouts.popitem(last=False)
+        return layout
+
+    def line_height(self, size: int) -> int:
+        """Baseline-to-baseline distance at a font size."""
+        return size + round(self._config.line_spacing * size / self._config.size)
+
+    def _layout(self, quote: str, size: int, box_width: int) -> QuoteLayout:
+        font = load_font(self._config.paths, size)
+        lines = measurer(font).wrap(quote, box_width)
+        line_height = self.line_height(size)
+        return QuoteLayout(
+            font=font,
+            size=size,
+            lines=tuple(line for line, _ in lines),
+            line_height=line_height,
+            width=math.ceil(max((width for _, width in lines), default=0)),
+            height=len(lines) * line_height,
+        )
@@ -1,5 +1,28 @@
 """Services package."""
 
-from .art_service import ArtService, QuoteOverlayBuilder
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["ArtService", "QuoteOverlayBuilder"]
+if TYPE_CHECKING:
+    from .art_service import ArtService, RenderedArt
+    from .overlays import QuoteOverlayBuilder
+    from .pool import ArtPool
+    from .renderer import RenderExecutor
+
+__all__ = ["ArtPool", "ArtService", "QuoteOverlayBuilder", "RenderExecutor", "RenderedArt"]
+
+# Loaded on first use: spawned render workers import .renderer and should not
+# pay for the OpenAI client that .art_service pulls in.
+_MODULES = {
+    "ArtPool": ".pool",
+    "ArtService": ".art_service",
+    "QuoteOverlayBuilder": ".overlays",
+    "RenderExecutor": ".renderer",
+    "RenderedArt": ".art_service",
+}
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_MODULES[name], __name__), name)
@@ -1,152 +1,49 @@
 """Art generation service - facade for the generation pipeline."""
 
+import asyncio
 import io
-import random
-from datetime import datetime, timedelta
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import replace
 
-import httpx
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 
+from ..adapters.downloader import ImageDownloader
 from ..adapters.openai_adapter import OpenAIAdapter
-from ..config import DisplayConfig, FontConfig, QuoteConfig
+from ..config import (
+    CacheConfig,
+    DisplayConfig,
+    FontConfig,
+    QuoteConfig,
+    RenderConfig,
+    StorageConfig,
+)
 from ..generators.prompt import ArtPromptGenerator
 from ..generators.quote import QuoteGenerator
-from ..imaging.analyzer import ImageAnalyzer
-from ..imaging.quantizer import ImageQuantizer
-from ..imaging.text import FontLoader, TextRenderer, TextWrapper
 from ..data import Artist
-from ..models import TextColors, TextPosition, TimeOfDay
+from ..models import TimeOfDay
+from .events import EventBus
+from .generations import Generation, GenerationCache, RenderedArt, current_slot
+from .history import HistoryStore
+from .renderer import RenderExecutor
 
 
-class TimestampOverlayBuilder:
-    """Adds timestamp to images showing generation and next refresh time."""
-    
-    FONT_SIZE = 12  # 50% smaller than original 24
-    FONT_PATHS = (
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-        "/System/Library/Fonts/Helvetica.ttc",
-    )
-    
-    def __init__(self, display_config: DisplayConfig, refresh_interval_minutes: int = 30):
-        self._display_config = display_config
-        self._refresh_interval = refresh_interval_minutes
-        self._font = self._load_font()
-    
-    def _load_font(self) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-        """Load a small font for timestamp."""
-        for path in self.FONT_PATHS:
-            try:
-                return ImageFont.truetype(path, self.FONT_SIZE)
-            except (OSError, IOError):
-                continue
-        return ImageFont.load_default()
-    
-    def add_timestamp(self, image: Image.Image, timezone_offset_hours: int = -6) -> Image.Image:
-        """Add timestamp to bottom-right corner of image in local timezone."""
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-        
-        utc_now = datetime.utcnow()
-        local_now = utc_now + timedelta(hours=timezone_offset_hours)
-        next_refresh = local_now + timedelta(minutes=self._refresh_interval)
-        
-        text = f"{local_now.strftime('%H:%M')} | Next: {next_refresh.strftime('%H:%M')}"
-        
-        draw = ImageDraw.Draw(image)
-        bbox = draw.textbbox((0, 0), text, font=self._font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        padding = 10
-        x = self._display_config.width - text_width - padding
-        y = self._display_config.height - text_height - padding
-        
-        position = TextPosition(x=x, y=y, width=text_width, height=text_height)
-        brightness = ImageAnalyzer.get_region_brightness(image, position)
-        colors = ImageAnalyzer.get_optimal_text_colors(brightness)
-        
-        shadow_offset = 1
-        draw.text((x + shadow_offset, y + shadow_offset), text, fill=colors.shadow, font=self._font)
-        draw.text((x, y), text, fill=colors.text, font=self._font)
-        return image
-    
-    def add_artist_name(self, image: Image.Image, artist_name: str) -> Image.Image:
-        """Add artist name to top-right corner of image."""
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-        
-        text = artist_name
-        
-        draw = ImageDraw.Draw(image)
-        bbox = draw.textbbox((0, 0), text, font=self._font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        padding = 10
-        x = self._display_config.width - text_width - padding
-        y = padding
-        
-        position = TextPosition(x=x, y=y, width=text_width, height=text_height)
-        brightness = ImageAnalyzer.get_region_brightness(image, position)
-        colors = ImageAnalyzer.get_optimal_text_colors(brightness)
-        
-        shadow_offset = 1
-        draw.text((x + shadow_offset, y + shadow_offset), text, fill=colors.shadow, font=self._font)
-        draw.text((x, y), text, fill=colors.text, font=self._font)
-        return image
+# Called with (stage, event) as a generation progresses; stages are
+# "prompt", "image", "download", "quote" and "render", and the event is
+# "started" or "finished".
+StageListener = Callable[[str, str], None]
 
+STAGES = ("prompt", "image", "download", "quote", "render")
 
-class QuoteOverlayBuilder:
-    """Builds quote overlay on images."""
-    
-    def __init__(self, display_config: DisplayConfig, font_config: FontConfig):
-        self._display_config = display_config
-        self._font_config = font_config
-        self._font = FontLoader(font_config).load()
-        self._line_height = font_config.size + font_config.line_spacing
-    
-    def add_quote(self, image: Image.Image, quote: str) -> Image.Image:
-        """Add quote overlay to image."""
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-        
-        # Wrap text
-        wrapper = TextWrapper(self._font, self._display_config.width - 100)
-        lines = wrapper.wrap(quote)
-        
-        # Calculate position
-        position = self._calculate_position(lines)
-        
-        # Determine colors based on background
-        brightness = ImageAnalyzer.get_region_brightness(image, position)
-        colors = ImageAnalyzer.get_optimal_text_colors(brightness)
-        
-        # Render
-        renderer = TextRenderer(self._font, self._line_height)
-        return renderer.render(image, lines, position, colors)
-    
-    def _calculate_position(self, lines: list[str]) -> TextPosition:
-        """Calculate random position for text block."""
-        from PIL import ImageDraw
-        draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
-        
-        text_height = len(lines) * self._line_height
-        max_line_width = max(
-            draw.textbbox((0, 0), line, font=self._font)[2] 
-            for line in lines
-        )
-        
-        margin = 50
-        max_x = self._display_config.width - max_line_width - margin
-        max_y = self._display_config.height - text_height - margin
-        
-        return TextPosition(
-            x=random.randint(margin, max(margin, max_x)),
-            y=random.randint(margin, max(margin, max_y)),
-            width=max_line_width,
-            height=text_height,
-        )
+
+@contextmanager
+def _stage(listener: StageListener | None, name: str) -> Iterator[None]:
+    """Report a stage's start and successful finish to an optional listener."""
+    if listener is not None:
+        listener(name, "started")
+    yield
+    if listener is not None:
+        listener(name, "finished")
 
 
 class ArtService:
@@ -158,15 +55,132 @@ class ArtService:
         display_config: DisplayConfig,
         font_config: FontConfig,
         quote_config: QuoteConfig,
+        cache_config: CacheConfig | None = None,
+        storage_config: StorageConfig | None = None,
+        renderer: RenderExecutor | None = None,
+        events: EventBus | None = None,
+        downloader: ImageDownloader | None = None,
+        history: HistoryStore | None = None,
     ):
         self._llm = llm
+        self._events = events
+        self._history = history
+        self._downloader = downloader or ImageDownloader()
         self._display_config = display_config
-        self._font_config = font_config
         self._prompt_generator = ArtPromptGenerator(llm, display_config)
         self._quote_generator = QuoteGenerator(llm, quote_config)
-        self._quantizer = ImageQuantizer(display_config)
-        self._overlay_builder = QuoteOverlayBuilder(display_config, font_config)
-        self._timestamp_builder = TimestampOverlayBuilder(display_config)
+        self._renderer = renderer or RenderExecutor(
+            RenderConfig(use_processes=False),
+            font_config,
+            (storage_config or StorageConfig()).palette_dir,
+        )
+        self._cache = GenerationCache(cache_config or CacheConfig())
+    
+    @property
+    def cache(self) -> GenerationCache:
+        """Cache of generations and rendered variants."""
+        return self._cache
+    
+    def resolve_display_config(
+        self,
+        width: int | None = None,
+        height: int | None = None,
+        num_colors: int | None = None,
+        dither: str | None = None,
+    ) -> DisplayConfig:
+        """Apply optional per-request overrides to the default display config."""
+        return replace(
+            self._display_config,
+            width=width or self._display_config.width,
+            height=height or self._display_config.height,
+            num_colors=num_colors or self._display_config.num_colors,
+            dither=dither or self._display_config.dither,
+        )
+    
+    async def render_art(
+        self,
+        time_of_day: TimeOfDay,
+        style: str | None = None,
+        custom_prompt: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        num_colors: int | None = None,
+        dither: str | None = None,
+        on_stage: StageListener | None = None,
+    ) -> RenderedArt:
+        """Produce encoded art for a display profile.
+        
+        A recent generation from the current slot that this profile hasn't
+        been served yet is rendered again instead of paying for a new one.
+        """
+        display_config = self.resolve_display_config(width, height, num_colors, dither)
+        generation = None
+        if style is None and custom_prompt is None:
+            generation = self._cache.shareable(display_config, current_slot())
+        if generation is None:
+            generation = await self.create_generation(
+                time_of_day, style, custom_prompt, on_stage=on_stage
+            )
+        generation.served_profiles.add(display_config)
+        return await self.render_generation(generation, display_config, on_stage)
+    
+    async def warm_start(self, max_profiles: int) -> list[DisplayConfig]:
+        """Load the newest archived render of recent profiles into the cache.
+
+        Returns the restored profiles. Without a history store nothing is
+        restored.
+        """
+        if self._history is None:
+            return []
+        restored = await self._history.latest_renders(self._display_config, max_profiles)
+        for generation, profile, rendered in restored:
+            generation.served_profiles.add(profile)
+            self._cache.add(generation)
+            self._cache.put_rendered(
+                generation.id, profile, rendered, len(rendered.image_data)
+            )
+        return [profile for _, profile, _ in restored]
+    
+    async def load_generation(self, generation_id: str) -> Generation | None:
+        """A generation from the cache, or from the history store if enabled.
+
+        Generations made by another worker process are only found in history.
+        """
+        generation = self._cache.get(generation_id)
+        if generation is None and self._history is not None:
+            generation = await self._history.load_generation(generation_id)
+            if generation is not None:
+                self._cache.add(generation)
+        return generation
+    
+    async def render_generation(
+        self,
+        generation: Generation,
+        display_config: DisplayConfig,
+        on_stage: StageListener | None = None,
+    ) -> RenderedArt:
+        """Render and encode a generation for a profile, reusing cached renders."""
+        rendered = self._cache.get_rendered(generation.id, display_config)
+        if rendered is not None:
+            return rendered
+        
+        on_stage = self._publishing(on_stage)
+        with _stage(on_stage, "render"):
+            image_data = await self.render(generation, display_config)
+        rendered = RenderedArt(
+            image_data=image_data,
+            prompt=generation.prompt,
+            quote=generation.quote,
+            artist=generation.artist,
+            time_of_day=generation.time_of_day,
+            generation_id=generation.id,
+        )
+        self._cache.put_rendered(
+            generation.id, display_config, rendered, len(rendered.image_data)
+        )
+        if self._history is not None:
+            self._history.record_render(generation.id, display_config, rendered)
+        return rendered
     
     async def generate_art(
         self, 
@@ -177,6 +191,7 @@ class ArtService:
         width: int | None = None,
         height: int | None = None,
         num_colors: int | None = None,
+        dither: str | None = None,
     ) -> tuple[Image.Image, str, str, Artist | None]:
         """Generate complete art with quote overlay.
         
@@ -184,53 +199,137 @@ class ArtService:
             width: Optional display width override (default: 800)
             height: Optional display height override (default: 480)
             num_colors: Number of colors for palette (2, 3, 6, or 7)
+            dither: Optional dithering method override
         
         Returns:
             Tuple of (image, prompt, quote, artist) where artist is the artist of the day if used.
         """
-        if width or height or num_colors:
-            display_config = DisplayConfig(
-                width=width or self._display_config.width,
-                height=height or self._display_config.height,
-                num_colors=num_colors or self._display_config.num_colors,
+        generation = await self.create_generation(
+            time_of_day, style, custom_prompt, use_artist_of_day
+        )
+        display_config = self.resolve_display_config(width, height, num_colors, dither)
+        image = Image.open(io.BytesIO(await self.render(generation, display_config)))
+        return image, generation.prompt, generation.quote, generation.artist
+    
+    async def create_generation(
+        self,
+        time_of_day: TimeOfDay,
+        style: str | None = None,
+        custom_prompt: str | None = None,
+        use_artist_of_day: bool = True,
+        on_stage: StageListener | None = None,
+    ) -> Generation:
+        """Run the LLM stages and cache the resulting source image."""
+        slot = current_slot()
+        on_stage = self._publishing(on_stage)
+        if self._events is not None:
+            self._events.publish("generation_started", {
+                "time_of_day": time_of_day.value,
+                "style": style,
+                "custom_prompt": custom_prompt is not None,
+            })
+        
+        # The quote doesn't depend on the image, so fetch it while the
+        # prompt, DALL-E and download stages run and join it at overlay time.
+        quote_task = asyncio.create_task(self._generate_quote(on_stage))
+        try:
+            image, encoded, prompt, artist = await self._generate_source_image(
+                time_of_day, style, custom_prompt, use_artist_of_day, on_stage
             )
-            quantizer = ImageQuantizer(display_config)
-            overlay_builder = QuoteOverlayBuilder(display_config, self._font_config)
-            timestamp_builder = TimestampOverlayBuilder(display_config)
-        else:
-            display_config = self._display_config
-            quantizer = self._quantizer
-            overlay_builder = self._overlay_builder
-            timestamp_builder = self._timestamp_builder
+            quote = await quote_task
+        finally:
+            if not quote_task.done():
+                quote_task.cancel()
+                # Let the cancellation finish before the error propagates.
+                await asyncio.gather(quote_task, return_exceptions=True)
         
+        generation = Generation(
+            source=image,
+            prompt=prompt,
+            quote=quote,
+            artist=artist,
+            time_of_day=time_of_day,
+            slot=slot,
+            shareable=style is None and custom_prompt is None and use_artist_of_day,
+            encoded=encoded,
+        )
+        self._cache.add(generation)
+        if self._history is not None:
+            self._history.record_generation(generation)
+        return generation
+    
+    async def render(self, generation: Generation, display_config: DisplayConfig) -> bytes:
+        """Overlay, quantize, timestamp and encode a generation off the event loop."""
+        return await self._renderer.render(
+            generation.source,
+            generation.quote,
+            generation.artist.name if generation.artist else None,
+            display_config,
+        )
+    
+    async def _generate_source_image(
+        self,
+        time_of_day: TimeOfDay,
+        style: str | None,
+        custom_prompt: str | None,
+        use_artist_of_day: bool,
+        on_stage: StageListener | None = None,
+    ) -> tuple[Image.Image, bytes | bytearray, str, Artist | None]:
+        """Run the prompt, DALL-E and download stages.
+
+        Returns:
+            Tuple of (source image, its encoded bytes, prompt, artist).
+        """
         artist = None
-        if custom_prompt:
-            prompt = self._prompt_generator.build_custom_prompt(custom_prompt)
-        else:
-            prompt, artist = self._prompt_generator.generate(time_of_day, style, use_artist_of_day)
-        
-        try:
-            image_url = self._llm.generate_image(prompt)
-        except Exception as e:
-            if "content_policy_violation" in str(e) or "safety" in str(e).lower():
-                prompt, _ = self._prompt_generator.generate(time_of_day, style, use_artist_of_day=False)
-                image_url = self._llm.generate_image(prompt)
-                artist = None
+        with _stage(on_stage, "prompt"):
+            if custom_prompt:
+                prompt = self._prompt_generator.build_custom_prompt(custom_prompt)
             else:
-                raise
-        image = await self._download_image(image_url)
+                prompt, artist = await self._prompt_generator.generate(
+                    time_of_day, style, use_artist_of_day
+                )
         
-        quote = self._quote_generator.generate()
-        image = overlay_builder.add_quote(image, quote)
+        with _stage(on_stage, "image"):
+            try:
+                generated = await self._llm.generate_image(prompt)
+            except Exception as e:
+                if "content_policy_violation" in str(e) or "safety" in str(e).lower():
+                    prompt, _ = await self._prompt_generator.generate(
+                        time_of_day, style, use_artist_of_day=False
+                    )
+                    generated = await self._llm.generate_image(prompt)
+                    artist = None
+                else:
+                    raise
+        if generated.data is not None:
+            # Inline (b64_json) results need no second round-trip.
+            encoded = generated.data
+            image = Image.open(io.BytesIO(encoded))
+            image.load()
+        else:
+            with _stage(on_stage, "download"):
+                image, encoded = await self._download_image(generated.url)
+        return image, encoded, prompt, artist
+    
+    def _publishing(self, on_stage: StageListener | None) -> StageListener | None:
+        """Wrap a stage listener so finished stages are also published as events."""
+        if self._events is None:
+            return on_stage
+        events = self._events
         
-        display_image = quantizer.quantize(image)
-        display_image = timestamp_builder.add_timestamp(display_image)
-        if artist:
-            display_image = timestamp_builder.add_artist_name(display_image, artist.name)
+        def listener(stage: str, event: str) -> None:
+            if on_stage is not None:
+                on_stage(stage, event)
+            if event == "finished":
+                events.publish("stage_finished", {"stage": stage})
         
-        return display_image, prompt, quote, artist
+        return listener
+    
+    async def _generate_quote(self, on_stage: StageListener | None = None) -> str:
+        with _stage(on_stage, "quote"):
+            return await self._quote_generator.generate()
     
-    def preview_prompt(
+    async def preview_prompt(
         self,
         time_of_day: TimeOfDay,
         style: str | None = None,
@@ -244,12 +343,8 @@ class ArtService:
         """
         if custom_prompt:
             return self._prompt_generator.build_custom_prompt(custom_prompt), None
-        return self._prompt_generator.generate(time_of_day, style, use_artist_of_day)
+        return await self._prompt_generator.generate(time_of_day, style, use_artist_of_day)
     
-    @staticmethod
-    async def _download_image(url: str) -> Image.Image:
-        """Download image from URL."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-        return Image.open(io.BytesIO(response.content))
+    async def _download_image(self, url: str) -> tuple[Image.Image, bytearray]:
+        """Download image from URL, with its encoded bytes."""
+        return await self._downloader.download(url)
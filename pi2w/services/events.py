@@ -0,0 +1,72 @@
+"""In-process publish/subscribe for server-sent events."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+
+class EventBus:
+    """Fans events out to every subscriber.
+
+    Each subscriber has a bounded queue; a subscriber that falls behind
+    loses its oldest events rather than slowing down publishers.
+    """
+
+    def __init__(self, queue_size: int = 64):
+        self._queue_size = queue_size
+        self._subscribers: set[asyncio.Queue[tuple[str, dict[str, Any]] | None]] = set()
+        self._closed = False
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, data: dict[str, Any] | None = None) -> None:
+        """Send an event to all current subscribers."""
+        message = (event, data or {})
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def close(self) -> None:
+        """End every open stream, and any opened later, so shutdown is not held up."""
+        self._closed = True
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    async def stream(
+        self,
+        heartbeat_seconds: float = 15.0,
+        disconnected: Callable[[], Awaitable[bool]] | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield events formatted for a text/event-stream response.
+
+        A comment line is sent when nothing happened for
+        ``heartbeat_seconds`` so proxies keep the connection open. The
+        stream ends when the bus is closed or ``disconnected`` reports
+        that the client went away.
+        """
+        if self._closed:
+            return
+        queue: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue(self._queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), heartbeat_seconds)
+                except TimeoutError:
+                    if disconnected is not None and await disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    return
+                event, data = message
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self._subscribers.discard(queue)
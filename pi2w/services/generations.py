@@ -0,0 +1,146 @@
+"""Generations and an LRU cache of source images and rendered variants."""
+
+import hashlib
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+from PIL import Image
+
+from ..config import CacheConfig, DisplayConfig
+from ..data import Artist, get_artist_of_the_day
+from ..models import TimeOfDay
+
+Slot = tuple[str, str | None]
+
+
+def current_slot() -> Slot:
+    """Key identifying the current time of day and artist rotation."""
+    artist = get_artist_of_the_day()
+    return TimeOfDay.current().value, artist.name if artist else None
+
+
+@dataclass
+class Generation:
+    """One paid generation: the un-quantized source image and its text.
+
+    Any display profile can be rendered from it without calling the LLM.
+    """
+    source: Image.Image
+    prompt: str
+    quote: str
+    artist: Artist | None
+    time_of_day: TimeOfDay
+    slot: Slot
+    shareable: bool = True
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    created_at: datetime = field(default_factory=datetime.now)
+    served_profiles: set[DisplayConfig] = field(default_factory=set)
+    # The source as DALL-E returned it, archived as-is rather than re-encoded.
+    encoded: bytes | bytearray | None = None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate in-memory size of the source image and its encoding."""
+        pixels = self.source.width * self.source.height * len(self.source.getbands())
+        return pixels + len(self.encoded or b"")
+
+
+@dataclass
+class RenderedArt:
+    """A finished, encoded image ready to serve."""
+    image_data: bytes
+    prompt: str
+    quote: str
+    artist: Artist | None
+    time_of_day: TimeOfDay
+    generation_id: str | None = None
+    created_at: datetime = field(default_factory=datetime.now)
+    etag: str = field(init=False)
+    
+    def __post_init__(self):
+        # Strong validator, hashed once per render rather than per request.
+        self.etag = f'"{hashlib.sha256(self.image_data).hexdigest()[:32]}"'
+
+
+class GenerationCache:
+    """LRU cache of generations and their per-profile renders.
+
+    Source images are keyed by generation id and rendered variants by
+    (generation id, profile). Both share one memory budget; the least
+    recently used entries are evicted first.
+    """
+
+    def __init__(self, config: CacheConfig):
+        self._config = config
+        self._budget = config.memory_budget_mb * 1024 * 1024
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._size = 0
+
+    def add(self, generation: Generation) -> None:
+        """Cache a new generation."""
+        self._put(("source", generation.id), generation, generation.nbytes)
+
+    def shareable(self, profile: DisplayConfig, slot: Slot) -> Generation | None:
+        """Newest recent generation for this slot not yet served to the profile."""
+        oldest = datetime.now() - timedelta(minutes=self._config.share_minutes)
+        for key, (value, _) in reversed(self._entries.items()):
+            if key[0] != "source":
+                continue
+            generation: Generation = value
+            if (
+                generation.shareable
+                and generation.slot == slot
+                and generation.created_at >= oldest
+                and profile not in generation.served_profiles
+            ):
+                self._entries.move_to_end(key)
+                return generation
+        return None
+
+    def get(self, generation_id: str) -> Generation | None:
+        """Cached generation by id."""
+        entry = self._entries.get(("source", generation_id))
+        if entry is None:
+            return None
+        self._entries.move_to_end(("source", generation_id))
+        return entry[0]
+
+    def latest(self) -> Generation | None:
+        """Most recently created generation still in the cache."""
+        generations = [v for k, (v, _) in self._entries.items() if k[0] == "source"]
+        return max(generations, key=lambda g: g.created_at, default=None)
+
+    def get_rendered(self, generation_id: str, profile: DisplayConfig) -> Any | None:
+        """Cached render of a generation for a profile."""
+        entry = self._entries.get((generation_id, profile))
+        if entry is None:
+            return None
+        self._entries.move_to_end((generation_id, profile))
+        return entry[0]
+
+    def put_rendered(
+        self, generation_id: str, profile: DisplayConfig, rendered: Any, nbytes: int
+    ) -> None:
+        """Cache a render of a generation for a profile."""
+        self._put((generation_id, profile), rendered, nbytes)
+
+    def stats(self) -> dict[str, int]:
+        """Entry count and memory use."""
+        return {
+            "generations": sum(1 for k in self._entries if k[0] == "source"),
+            "renders": sum(1 for k in self._entries if k[0] != "source"),
+            "bytes": self._size,
+            "budget_bytes": self._budget,
+        }
+
+    def _put(self, key: tuple, value: Any, nbytes: int) -> None:
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self._size += nbytes
+        while self._size > self._budget and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted
@@ -0,0 +1,459 @@
+"""Persistent history of generations and their renders."""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from ..config import DisplayConfig, HistoryConfig
+from ..data import Artist
+from ..models import TimeOfDay
+from .generations import Generation, RenderedArt
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    prompt TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    artist_name TEXT,
+    artist_birth_year INTEGER,
+    artist_style TEXT,
+    artist_description TEXT,
+    time_of_day TEXT NOT NULL,
+    slot_time TEXT NOT NULL,
+    slot_artist TEXT,
+    shareable INTEGER NOT NULL,
+    source_digest TEXT NOT NULL,
+    source_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_created ON generations (created_at);
+CREATE INDEX IF NOT EXISTS generations_artist ON generations (artist_name, created_at);
+CREATE INDEX IF NOT EXISTS generations_time_of_day ON generations (time_of_day, created_at);
+
+CREATE TABLE IF NOT EXISTS renders (
+    generation_id TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    num_colors INTEGER NOT NULL,
+    dither TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    PRIMARY KEY (generation_id, width, height, num_colors, dither)
+);
+CREATE INDEX IF NOT EXISTS renders_profile ON renders (width, height, num_colors, dither);
+"""
+
+
+class HistoryStore:
+    """Content-addressed image blobs with a SQLite (WAL) metadata index.
+
+    Blobs are named by the SHA-256 of their bytes, so identical images are
+    stored once. Writes run on worker threads in the background; readers
+    await the ones already queued. Generations past ``max_age_days`` or
+    beyond the ``max_size_mb`` budget are evicted oldest first, together
+    with their renders.
+    """
+
+    def __init__(self, directory: Path, config: HistoryConfig):
+        self._config = config
+        self._blob_dir = directory / "blobs"
+        self._blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(directory / "index.db", check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._pending: set[asyncio.Task] = set()
+
+    def record_generation(self, generation: Generation) -> None:
+        """Archive a new generation's source image and metadata in the background."""
+        self._spawn(self._save_generation, generation)
+
+    def record_render(
+        self, generation_id: str, profile: DisplayConfig, rendered: RenderedArt
+    ) -> None:
+        """Archive a rendered variant in the background."""
+        self._spawn(self._save_render, generation_id, profile, rendered)
+
+    async def page(
+        self,
+        page: int = 1,
+        per_page: int = 20,
+        artist: str | None = None,
+        time_of_day: str | None = None,
+        profile: DisplayConfig | None = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Newest-first generations matching the filters, and the total count."""
+        await self.flush()
+        return await asyncio.to_thread(
+            self._page, page, per_page, artist, time_of_day, profile
+        )
+
+    async def get(self, generation_id: str) -> dict[str, Any] | None:
+        """Metadata and renders of one generation."""
+        await self.flush()
+        return await asyncio.to_thread(self._get, generation_id)
+
+    async def rendered(
+        self, generation_id: str, profile: DisplayConfig
+    ) -> tuple[bytes, str, datetime] | None:
+        """Stored render for a profile as (PNG bytes, ETag, created time)."""
+        await self.flush()
+        return await asyncio.to_thread(self._rendered, generation_id, profile)
+
+    async def source(self, generation_id: str) -> bytes | None:
+        """Encoded source image of a generation."""
+        await self.flush()
+        return await asyncio.to_thread(self._source, generation_id)
+
+    async def load_generation(self, generation_id: str) -> Generation | None:
+        """Rebuild a generation from the archive so it can be rendered again."""
+        await self.flush()
+        return await asyncio.to_thread(self._load_generation, generation_id)
+
+    async def latest_renders(
+        self, base: DisplayConfig, max_profiles: int
+    ) -> list[tuple[Generation, DisplayConfig, RenderedArt]]:
+        """Newest render of each of the most recently rendered profiles.
+
+        Profiles are ``base`` with the stored size, colors and dither.
+        """
+        await self.flush()
+        return await asyncio.to_thread(self._latest_renders, base, max_profiles)
+
+    async def flush(self) -> None:
+        """Wait for queued writes."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Finish queued writes and close the index."""
+        await self.flush()
+        with self._lock:
+            self._db.close()
+
+    def _spawn(self, func, *args) -> None:
+        task = asyncio.create_task(asyncio.to_thread(self._guarded, func, *args))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    def _guarded(func, *args) -> None:
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Could not write generation history")
+
+    # Blobs
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blob_dir / digest[:2] / f"{digest}.png"
+
+    def _put_blob(self, data: bytes | bytearray) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        return digest
+
+    def _read_blob(self, digest: str) -> bytes | None:
+        try:
+            return self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    # Writes
+
+    def _save_generation(self, generation: Generation) -> None:
+        data = generation.encoded
+        if data is None:
+            buffer = io.BytesIO()
+            generation.source.save(buffer, format="PNG", compress_level=1)
+            data = buffer.getvalue()
+        digest = self._put_blob(data)
+        artist = generation.artist
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO generations VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    generation.id,
+                    generation.created_at.timestamp(),
+                    generation.prompt,
+                    generation.quote,
+                    artist.name if artist else None,
+                    artist.birth_year if artist else None,
+                    artist.style if artist else None,
+                    artist.description if artist else None,
+                    generation.time_of_day.value,
+                    generation.slot[0],
+                    generation.slot[1],
+                    int(generation.shareable),
+                    digest,
+                    len(data),
+                ),
+            )
+            self._evict()
+
+    def _save_render(
+        self, generation_id: str, profile: DisplayConfig, rendered: RenderedArt
+    ) -> None:
+        digest = self._put_blob(rendered.image_data)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO renders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    generation_id,
+                    profile.width,
+                    profile.height,
+                    profile.num_colors,
+                    profile.dither,
+                    rendered.created_at.timestamp(),
+                    digest,
+                    len(rendered.image_data),
+                    rendered.etag,
+                ),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired generations, then the oldest until under the size budget."""
+        oldest = (datetime.now() - timedelta(days=self._config.max_age_days)).timestamp()
+        doomed = [
+            row["id"] for row in self._db.execute(
+                "SELECT id FROM generations WHERE created_at < ?", (oldest,)
+            )
+        ]
+        budget = self._config.max_size_mb * 1024 * 1024
+        total = self._db.execute(
+            "SELECT (SELECT COALESCE(SUM(source_size), 0) FROM generations)"
+            " + (SELECT COALESCE(SUM(size), 0) FROM renders)"
+        ).fetchone()[0]
+        if total > budget:
+            rows = self._db.execute(
+                "SELECT g.id, g.source_size + COALESCE(SUM(r.size), 0) AS size"
+                " FROM generations g LEFT JOIN renders r ON r.generation_id = g.id"
+                " WHERE g.created_at >= ? GROUP BY g.id ORDER BY g.created_at",
+                (oldest,),
+            ).fetchall()
+            # Keep at least the newest generation, however large it is.
+            for row in rows[:-1]:
+                if total <= budget:
+                    break
+                doomed.append(row["id"])
+                total -= row["size"]
+        for generation_id in doomed:
+            self._delete(generation_id)
+
+    def _delete(self, generation_id: str) -> None:
+        digests = {
+            row[0] for row in self._db.execute(
+                "SELECT source_digest FROM generations WHERE id = ?"
+                " UNION SELECT digest FROM renders WHERE generation_id = ?",
+                (generation_id, generation_id),
+            )
+        }
+        self._db.execute("DELETE FROM renders WHERE generation_id = ?", (generation_id,))
+        self._db.execute("DELETE FROM generations WHERE id = ?", (generation_id,))
+        for digest in digests:
+            still_used = self._db.execute(
+                "SELECT 1 FROM generations WHERE source_digest = ?"
+                " UNION ALL SELECT 1 FROM renders WHERE digest = ? LIMIT 1",
+                (digest, digest),
+            ).fetchone()
+            if still_used is None:
+                self._blob_path(digest).unlink(missing_ok=True)
+
+    # Reads
+
+    def _page(
+        self,
+        page: int,
+        per_page: int,
+        artist: str | None,
+        time_of_day: str | None,
+        profile: DisplayConfig | None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        clauses, params = [], []
+        if artist is not None:
+            clauses.append("artist_name = ?")
+            params.append(artist)
+        if time_of_day is not None:
+            clauses.append("time_of_day = ?")
+            params.append(time_of_day)
+        if profile is not None:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM renders r WHERE r.generation_id = generations.id"
+                " AND r.width = ? AND r.height = ? AND r.num_colors = ? AND r.dither = ?)"
+            )
+            params += [profile.width, profile.height, profile.num_colors, profile.dither]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            total = self._db.execute(
+                f"SELECT COUNT(*) FROM generations {where}", params
+            ).fetchone()[0]
+            rows = self._db.execute(
+                f"SELECT * FROM generations {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                [*params, per_page, (page - 1) * per_page],
+            ).fetchall()
+            return [self._describe(row) for row in rows], total
+
+    def _get(self, generation_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM generations WHERE id = ?", (generation_id,)
+            ).fetchone()
+            return self._describe(row) if row else None
+
+    def _describe(self, row: sqlite3.Row) -> dict[str, Any]:
+        renders = self._db.execute(
+            "SELECT width, height, num_colors, dither, size FROM renders"
+            " WHERE generation_id = ? ORDER BY created_at",
+            (row["id"],),
+        ).fetchall()
+        return {
+            "id": row["id"],
+            "created_at": datetime.fromtimestamp(row["created_at"]).isoformat(),
+            "prompt": row["prompt"],
+            "quote": row["quote"],
+            "artist": {
+                "name": row["artist_name"], "style": row["artist_style"]
+            } if row["artist_name"] else None,
+            "time_of_day": row["time_of_day"],
+            "source_bytes": row["source_size"],
+            "renders": [
+                {
+                    "width": r["width"],
+                    "height": r["height"],
+                    "colors": r["num_colors"],
+                    "dither": r["dither"],
+                    "bytes": r["size"],
+                }
+                for r in renders
+            ],
+        }
+
+    def _rendered(
+        self, generation_id: str, profile: DisplayConfig
+    ) -> tuple[bytes, str, datetime] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest, etag, created_at FROM renders WHERE generation_id = ?"
+                " AND width = ? AND height = ? AND num_colors = ? AND dither = ?",
+                (
+                    generation_id, profile.width, profile.height,
+                    profile.num_colors, profile.dither,
+                ),
+            ).fetchone()
+        if row is None:
+            return None
+        data = self._read_blob(row["digest"])
+        if data is None:
+            return None
+        return data, row["etag"], datetime.fromtimestamp(row["created_at"])
+
+    def _source(self, generation_id: str) -> bytes | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT source_digest FROM generations WHERE id = ?", (generation_id,)
+            ).fetchone()
+        return self._read_blob(row[0]) if row else None
+
+    def _load_generation(self, generation_id: str) -> Generation | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM generations WHERE id = ?", (generation_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        data = self._read_blob(row["source_digest"])
+        if data is None:
+            return None
+        source = Image.open(io.BytesIO(data))
+        source.load()
+        return Generation(
+            source=source,
+            prompt=row["prompt"],
+            quote=row["quote"],
+            artist=self._artist(row),
+            time_of_day=TimeOfDay(row["time_of_day"]),
+            slot=(row["slot_time"], row["slot_artist"]),
+            shareable=bool(row["shareable"]),
+            id=row["id"],
+            created_at=datetime.fromtimestamp(row["created_at"]),
+            encoded=data,
+        )
+
+    @staticmethod
+    def _artist(row: sqlite3.Row) -> Artist | None:
+        if not row["artist_name"]:
+            return None
+        return Artist(
+            row["artist_name"], row["artist_birth_year"],
+            row["artist_style"], row["artist_description"],
+        )
+
+    @staticmethod
+    def _profile(base: DisplayConfig, row: sqlite3.Row) -> DisplayConfig:
+        return replace(
+            base,
+            width=row["width"],
+            height=row["height"],
+            num_colors=row["num_colors"],
+            dither=row["dither"],
+        )
+
+    def _latest_renders(
+        self, base: DisplayConfig, max_profiles: int
+    ) -> list[tuple[Generation, DisplayConfig, RenderedArt]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.* FROM renders r JOIN ("
+                " SELECT width, height, num_colors, dither,"
+                " MAX(created_at) AS newest FROM renders"
+                " GROUP BY width, height, num_colors, dither"
+                " ORDER BY newest DESC LIMIT ?"
+                ") n USING (width, height, num_colors, dither)"
+                " WHERE r.created_at = n.newest ORDER BY r.created_at",
+                (max_profiles,),
+            ).fetchall()
+        generations: dict[str, Generation | None] = {}
+        restored = []
+        for row in rows:
+            generation_id = row["generation_id"]
+            if generation_id not in generations:
+                generations[generation_id] = self._load_generation(generation_id)
+            generation = generations[generation_id]
+            data = self._read_blob(row["digest"])
+            if generation is None or data is None:
+                continue
+            rendered = RenderedArt(
+                image_data=data,
+                prompt=generation.prompt,
+                quote=generation.quote,
+                artist=generation.artist,
+                time_of_day=generation.time_of_day,
+                generation_id=generation.id,
+                created_at=datetime.fromtimestamp(row["created_at"]),
+            )
+            restored.append((generation, self._profile(base, row), rendered))
+        return restored
+
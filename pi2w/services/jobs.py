@@ -0,0 +1,200 @@
+"""Queued background generations that clients poll for."""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any
+
+from ..config import JobConfig
+from ..models import TimeOfDay
+from .art_service import STAGES, ArtService, RenderedArt
+from .pool import ArtPool
+
+logger = logging.getLogger(__name__)
+
+
+class JobState(Enum):
+    """Lifecycle of a queued generation."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when the queue already holds the maximum number of jobs."""
+
+
+@dataclass(frozen=True)
+class JobRequest:
+    """Parameters of a queued generation, as accepted by /art."""
+    style: str | None = None
+    prompt: str | None = None
+    width: int | None = None
+    height: int | None = None
+    colors: int | None = None
+    dither: str | None = None
+
+
+@dataclass
+class Job:
+    """A queued generation and its progress."""
+    request: JobRequest
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    state: JobState = JobState.QUEUED
+    stages: dict[str, str] = field(default_factory=lambda: dict.fromkeys(STAGES, "pending"))
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    art: RenderedArt | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (JobState.SUCCEEDED, JobState.FAILED)
+
+    def record_stage(self, stage: str, event: str) -> None:
+        """Stage listener for ArtService."""
+        self.stages[stage] = "running" if event == "started" else "done"
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready summary of the job."""
+        return {
+            "id": self.id,
+            "state": self.state.value,
+            "stages": self.stages,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded queue of generations run by a fixed number of workers.
+
+    Finished jobs are kept for ``JobConfig.retention_minutes`` so clients
+    can collect the result, up to ``JobConfig.max_finished`` of them.
+    """
+
+    def __init__(
+        self,
+        art_service: ArtService,
+        config: JobConfig,
+        pool: ArtPool | None = None,
+        on_done: Callable[[RenderedArt], Awaitable[None]] | None = None,
+    ):
+        self._art_service = art_service
+        self._config = config
+        self._pool = pool
+        self._on_done = on_done
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(maxsize=config.max_queued)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._workers: list[asyncio.Task] = []
+
+    def submit(self, request: JobRequest) -> Job:
+        """Queue a generation. Raises JobQueueFull if no slot is free."""
+        self._prune()
+        job = Job(request)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self._config.max_queued} jobs already queued") from None
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by id."""
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        """Queued, running and retained finished jobs."""
+        states = [job.state for job in self._jobs.values()]
+        return {
+            "queued": states.count(JobState.QUEUED),
+            "running": states.count(JobState.RUNNING),
+            "finished": sum(1 for job in self._jobs.values() if job.finished),
+        }
+
+    def start(self) -> None:
+        """Start the workers."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self._config.concurrency)
+            ]
+
+    async def stop(self) -> None:
+        """Cancel the workers and any job they are running."""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        """Run one job, recording its outcome on the job."""
+        job.state = JobState.RUNNING
+        job.started_at = datetime.now()
+        request = job.request
+        try:
+            art = None
+            if self._pool is not None and request.style is None and request.prompt is None:
+                art = await self._pool.pop(self._art_service.resolve_display_config(
+                    request.width, request.height, request.colors, request.dither
+                ))
+            if art is None:
+                art = await self._art_service.render_art(
+                    TimeOfDay.current(), request.style, request.prompt,
+                    width=request.width, height=request.height,
+                    num_colors=request.colors, dither=request.dither,
+                    on_stage=job.record_stage,
+                )
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            job.state = JobState.FAILED
+            job.error = str(e)
+            self._close_stages(job, "failed")
+        else:
+            job.art = art
+            job.state = JobState.SUCCEEDED
+            self._close_stages(job, "skipped")
+            if self._on_done is not None:
+                # The job has its result; a failing callback must not stop
+                # this worker from taking the next one.
+                try:
+                    await self._on_done(art)
+                except Exception:
+                    logger.exception("Completion callback failed for job %s", job.id)
+        finally:
+            job.finished_at = datetime.now()
+
+    @staticmethod
+    def _close_stages(job: Job, outcome: str) -> None:
+        """Mark stages that never finished: running ones failed, pending ones skipped."""
+        for stage, status in job.stages.items():
+            if status == "running":
+                job.stages[stage] = outcome
+            elif status == "pending":
+                job.stages[stage] = "skipped"
+
+    def _prune(self) -> None:
+        """Forget finished jobs past their retention time or beyond the cap."""
+        oldest = datetime.now() - timedelta(minutes=self._config.retention_minutes)
+        finished = [job for job in self._jobs.values() if job.finished]
+        expired = len(finished) - self._config.max_finished
+        for job in finished:
+            if expired > 0 or job.finished_at < oldest:
+                del self._jobs[job.id]
+                expired -= 1
@@ -0,0 +1,183 @@
+"""Text overlays drawn on rendered art."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from ..config import DisplayConfig, FontConfig
+from ..imaging.analyzer import ImageAnalyzer, RegionStats
+from ..imaging.text import TextRenderer, load_font
+from ..imaging.typesetter import QuoteLayout, Typesetter
+from ..models import TextPosition
+
+
+def _ink(image: Image.Image, color: tuple[int, int, int]) -> tuple[int, int, int] | int:
+    """Fill for ``color``: the nearest palette index on paletted images."""
+    if image.mode != "P":
+        return color
+    palette = image.getpalette()
+    entries = [palette[i:i + 3] for i in range(0, len(palette), 3)]
+    return min(
+        range(len(entries)),
+        key=lambda i: sum((a - b) ** 2 for a, b in zip(entries[i], color, strict=True)),
+    )
+
+
+class TimestampOverlayBuilder:
+    """Adds timestamp to images showing generation and next refresh time."""
+    
+    FONT_SIZE = 12  # 50% smaller than original 24
+    FONT_PATHS = (
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+        "/System/Library/Fonts/Helvetica.ttc",
+    )
+    
+    def __init__(self, display_config: DisplayConfig, refresh_interval_minutes: int = 30):
+        self._display_config = display_config
+        self._refresh_interval = refresh_interval_minutes
+        self._font = self._load_font()
+    
+    def _load_font(self) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+        """Load a small font for timestamp."""
+        return load_font(self.FONT_PATHS, self.FONT_SIZE)
+    
+    def add_timestamp(self, image: Image.Image, timezone_offset_hours: int = -6) -> Image.Image:
+        """Add timestamp to bottom-right corner of image in local timezone.
+        
+        Paletted images stay paletted: text is drawn unsmoothed in the
+        nearest palette colors so no off-palette pixels are introduced.
+        """
+        if image.mode not in ("RGB", "P"):
+            image = image.convert("RGB")
+        
+        utc_now = datetime.utcnow()
+        local_now = utc_now + timedelta(hours=timezone_offset_hours)
+        next_refresh = local_now + timedelta(minutes=self._refresh_interval)
+        
+        text = f"{local_now.strftime('%H:%M')} | Next: {next_refresh.strftime('%H:%M')}"
+        
+        draw = ImageDraw.Draw(image)
+        bbox = draw.textbbox((0, 0), text, font=self._font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        
+        padding = 10
+        x = self._display_config.width - text_width - padding
+        y = self._display_config.height - text_height - padding
+        
+        position = TextPosition(x=x, y=y, width=text_width, height=text_height)
+        brightness = ImageAnalyzer.get_region_brightness(image, position)
+        colors = ImageAnalyzer.get_optimal_text_colors(brightness)
+        
+        shadow_offset = 1
+        draw.text(
+            (x + shadow_offset, y + shadow_offset), text,
+            fill=_ink(image, colors.shadow), font=self._font,
+        )
+        draw.text((x, y), text, fill=_ink(image, colors.text), font=self._font)
+        return image
+    
+    def add_artist_name(self, image: Image.Image, artist_name: str) -> Image.Image:
+        """Add artist name to top-right corner of image."""
+        if image.mode not in ("RGB", "P"):
+            image = image.convert("RGB")
+        
+        text = artist_name
+        
+        draw = ImageDraw.Draw(image)
+        bbox = draw.textbbox((0, 0), text, font=self._font)
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        
+        padding = 10
+        x = self._display_config.width - text_width - padding
+        y = padding
+        
+        position = TextPosition(x=x, y=y, width=text_width, height=text_height)
+        brightness = ImageAnalyzer.get_region_brightness(image, position)
+        colors = ImageAnalyzer.get_optimal_text_colors(brightness)
+        
+        shadow_offset = 1
+        draw.text(
+            (x + shadow_offset, y + shadow_offset), text,
+            fill=_ink(image, colors.shadow), font=self._font,
+        )
+        draw.text((x, y), text, fill=_ink(image, colors.text), font=self._font)
+        return image
+
+
+class QuoteOverlayBuilder:
+    """Builds quote overlay on images."""
+    
+    PLACEMENT_STEP = 8  # Candidate positions are this many pixels apart
+    MARGIN = 0.05       # Share of the shorter side kept clear around the quote
+    
+    def __init__(self, display_config: DisplayConfig, font_config: FontConfig):
+        self._display_config = display_config
+        self._font_config = font_config
+        self._typesetter = Typesetter(font_config)
+    
+    def add_quote(self, image: Image.Image, quote: str) -> Image.Image:
+        """Add quote overlay to image.
+        
+        The quote is set as large as fits ``FontConfig.box_width`` by
+        ``box_height`` of the image, which the quantizer later scales to
+        the display, so it covers the same share of every display.
+        """
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        
+        # Wrap and size text
+        layout = self._typesetter.fit(
+            quote,
+            int(image.width * self._font_config.box_width),
+            int(image.height * self._font_config.box_height),
+        )
+        
+        # Calculate position
+        stats = RegionStats(image)
+        position = self._calculate_position(layout, image.size, stats)
+        
+        # Determine colors based on background
+        brightness = stats.mean(position)
+        colors = ImageAnalyzer.get_optimal_text_colors(brightness)
+        
+        # Render
+        renderer = TextRenderer(layout.font, layout.line_height)
+        return renderer.render(image, list(layout.lines), position, colors)
+    
+    def _calculate_position(
+        self, layout: QuoteLayout, size: tuple[int, int], stats: RegionStats
+    ) -> TextPosition:
+        """Place the text block where the background is calmest and contrasts most.
+        
+        Every candidate position on a grid is scored by the contrast with
+        the text color chosen for its background, minus the background's
+        luminance standard deviation.
+        """
+        text_height = layout.height
+        max_line_width = layout.width
+        
+        width, height = size
+        margin = round(min(width, height) * self.MARGIN)
+        max_x = width - max_line_width - margin
+        max_y = height - text_height - margin
+        
+        xs = np.arange(margin, max(margin, max_x) + 1, self.PLACEMENT_STEP)
+        ys = np.arange(margin, max(margin, max_y) + 1, self.PLACEMENT_STEP)
+        means, variances = stats.grid(xs, ys, max_line_width, text_height)
+        # The text color get_optimal_text_colors will pick for each position.
+        threshold = ImageAnalyzer.TEXT_BRIGHTNESS_THRESHOLD
+        contrast = np.where(means > threshold, means, 255 - means)
+        row, column = np.unravel_index(
+            np.argmax(contrast - np.sqrt(variances)), means.shape
+        )
+        
+        return TextPosition(
+            x=int(xs[column]),
+            y=int(ys[row]),
+            width=max_line_width,
+            height=text_height,
+        )
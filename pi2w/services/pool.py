@@ -0,0 +1,163 @@
+"""Background pre-generation pool of ready-to-serve art."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from ..config import DisplayConfig, PoolConfig
+from ..models import TimeOfDay
+from .art_service import ArtService, RenderedArt
+from .generations import current_slot
+from .shared import SharedState
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _ProfileState:
+    """Refill bookkeeping for one display profile in this worker."""
+    in_flight: int = 0
+    last_requested: float = field(default_factory=time.monotonic)
+
+
+class ArtPool:
+    """Keeps a few finished images per display profile ready to serve.
+
+    Profiles are registered when they are requested. A background producer
+    refills each active profile up to ``PoolConfig.depth`` and discards
+    images that are too old or were made for a previous time of day or
+    artist rotation.
+
+    The images themselves live in ``SharedState``, so every worker process
+    draws from one pool and each image is handed out once. Refills go
+    through the shared generation lease: workers refilling a profile
+    together pay for one generation and pool it once. Unlike ``/art``,
+    a refill never reuses a generation that finished before it asked.
+    """
+
+    def __init__(self, art_service: ArtService, config: PoolConfig, shared: SharedState):
+        self._art_service = art_service
+        self._config = config
+        self._shared = shared
+        self._profiles: OrderedDict[DisplayConfig, _ProfileState] = OrderedDict()
+        self._semaphore = asyncio.Semaphore(config.concurrency)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._producers: set[asyncio.Task] = set()
+
+    async def pop(self, profile: DisplayConfig) -> RenderedArt | None:
+        """Take a ready image for the profile, or None if the pool is empty."""
+        self._touch(profile)
+        self._wakeup.set()
+        return await self._shared.pool_take(profile, current_slot(), self._oldest())
+
+    async def stats(self) -> dict[str, int]:
+        """Number of ready images per profile, across all workers."""
+        counts = await self._shared.pool_counts(current_slot(), self._oldest())
+        return {
+            f"{width}x{height}x{num_colors}/{dither}": count
+            for (width, height, num_colors, dither), count in counts.items()
+        }
+
+    async def resume(self) -> list[DisplayConfig]:
+        """Keep refilling the profiles pooled before a restart, and return them."""
+        counts = await self._shared.pool_counts(current_slot(), self._oldest())
+        profiles = [
+            self._art_service.resolve_display_config(*profile) for profile in counts
+        ]
+        for profile in profiles:
+            self._touch(profile)
+        return profiles
+
+    def start(self) -> None:
+        """Start the background producer."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the producer and cancel in-flight generations."""
+        tasks = list(self._producers)
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _touch(self, profile: DisplayConfig) -> _ProfileState:
+        """Register a request for the profile, evicting the least recently used."""
+        state = self._profiles.get(profile)
+        if state is None:
+            state = self._profiles[profile] = _ProfileState()
+            while len(self._profiles) > self._config.max_profiles:
+                self._profiles.popitem(last=False)
+        else:
+            self._profiles.move_to_end(profile)
+        state.last_requested = time.monotonic()
+        return state
+
+    def _oldest(self) -> datetime:
+        """Creation time of the oldest image still worth serving."""
+        return datetime.now() - timedelta(minutes=self._config.max_age_minutes)
+
+    async def _run(self) -> None:
+        """Refill the pool whenever it is drained or the poll interval passes."""
+        while True:
+            try:
+                await self._fill()
+            except Exception:
+                logger.exception("Checking the pool failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._config.poll_seconds)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _fill(self) -> None:
+        """Start producers for every active profile below the target depth."""
+        slot = current_slot()
+        counts = await self._shared.pool_counts(slot, self._oldest())
+        idle_after = self._config.profile_idle_minutes * 60
+        now = time.monotonic()
+        for profile, state in list(self._profiles.items()):
+            if now - state.last_requested > idle_after:
+                continue
+            pooled = counts.get(
+                (profile.width, profile.height, profile.num_colors, profile.dither), 0
+            )
+            # Workers that see the same shortfall refill the same positions,
+            # so their generations coalesce.
+            for position in range(pooled + state.in_flight, self._config.depth):
+                state.in_flight += 1
+                task = asyncio.create_task(self._produce(profile, state, position))
+                self._producers.add(task)
+                task.add_done_callback(self._producers.discard)
+
+    async def _produce(
+        self, profile: DisplayConfig, state: _ProfileState, position: int
+    ) -> None:
+        """Generate one image for the profile and add it to the pool."""
+        try:
+            async with self._semaphore:
+                slot = current_slot()
+
+                async def generate() -> RenderedArt:
+                    return await self._art_service.render_art(
+                        TimeOfDay(slot[0]),
+                        width=profile.width,
+                        height=profile.height,
+                        num_colors=profile.num_colors,
+                        dither=profile.dither,
+                    )
+
+                art = await self._shared.do(
+                    ("pool", profile, slot, position), generate, window_seconds=0
+                )
+            await self._shared.pool_add(profile, slot, art, self._oldest())
+        except Exception:
+            logger.exception("Pre-generation failed for %sx%s", profile.width, profile.height)
+        finally:
+            state.in_flight -= 1
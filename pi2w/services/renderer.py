@@ -0,0 +1,351 @@
+"""Off-loop rendering of generations into encoded display images."""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, TypeVar
+
+from PIL import Image
+
+from ..config import DisplayConfig, FontConfig, RenderConfig
+from ..imaging.dither import KERNELS
+from ..imaging.parallel import ParallelDiffusion
+from ..imaging.quantizer import ImageQuantizer
+from .overlays import QuoteOverlayBuilder, TimestampOverlayBuilder
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RenderPipeline:
+    """Quote overlay, quantization, timestamp and PNG encoding for one profile."""
+
+    def __init__(
+        self,
+        display_config: DisplayConfig,
+        font_config: FontConfig,
+        palette_dir: Path | None = None,
+        parallel: ParallelDiffusion | None = None,
+        compress_level: int = 6,
+    ):
+        self._compress_level = compress_level
+        self._bits = _png_bits(display_config.num_colors)
+        self._quantizer = ImageQuantizer(display_config, palette_dir, parallel)
+        self._overlay_builder = QuoteOverlayBuilder(display_config, font_config)
+        self._timestamp_builder = TimestampOverlayBuilder(display_config)
+
+    def render(self, source: Image.Image, quote: str, artist_name: str | None) -> Image.Image:
+        """Overlay, quantize and timestamp a source image."""
+        image = self._overlay_builder.add_quote(source.copy(), quote)
+        display_image = self._quantizer.quantize(image)
+        display_image = self._timestamp_builder.add_timestamp(display_image)
+        if artist_name:
+            display_image = self._timestamp_builder.add_artist_name(display_image, artist_name)
+        return display_image
+
+    def render_png(self, source: Image.Image, quote: str, artist_name: str | None) -> bytes:
+        """Render a source image and encode it as a paletted PNG."""
+        buffer = io.BytesIO()
+        self.render(source, quote, artist_name).save(
+            buffer, format="PNG", bits=self._bits, compress_level=self._compress_level
+        )
+        return buffer.getvalue()
+
+
+def _png_bits(num_colors: int) -> int:
+    """Smallest PNG palette bit depth (1, 2, 4 or 8) holding the colors."""
+    needed = max(num_colors - 1, 1).bit_length()
+    return next(bits for bits in (1, 2, 4, 8) if bits >= needed)
+
+
+class PipelineRegistry:
+    """Render pipelines built in this process, one per profile.
+
+    Building a pipeline loads its fonts and palette tables, so repeat
+    profiles reuse theirs. Beyond ``max_size`` profiles the least
+    recently used pipeline is dropped.
+    """
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self._pipelines: OrderedDict[tuple, RenderPipeline] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        display_config: DisplayConfig,
+        font_config: FontConfig,
+        palette_dir: Path | None,
+        compress_level: int,
+        parallel: ParallelDiffusion | None = None,
+    ) -> tuple[RenderPipeline, bool]:
+        """The pipeline for a profile, and whether it was already built."""
+        key = (display_config, font_config, palette_dir, compress_level)
+        with self._lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is not None:
+                self._pipelines.move_to_end(key)
+                return pipeline, True
+        pipeline = RenderPipeline(
+            display_config, font_config, palette_dir, parallel, compress_level
+        )
+        with self._lock:
+            self._pipelines[key] = pipeline
+            while len(self._pipelines) > self.max_size:
+                self._pipelines.popitem(last=False)
+        return pipeline, False
+
+
+# Each worker process fills its own registry on first use of a profile.
+_registry = PipelineRegistry()
+
+
+def _configure_worker(max_pipelines: int) -> None:
+    """Worker initializer: size this process's pipeline registry."""
+    _registry.max_size = max_pipelines
+
+
+def _warm(
+    profiles: list[DisplayConfig],
+    font_config: FontConfig,
+    palette_dir: Path | None,
+    compress_level: int,
+) -> None:
+    """Worker: build pipelines, loading their fonts and palette tables."""
+    for display_config in profiles:
+        _registry.get(display_config, font_config, palette_dir, compress_level)
+
+
+@dataclass(frozen=True)
+class _RenderJob:
+    """A render request whose source pixels live in shared memory."""
+    buffer_name: str
+    mode: str
+    size: tuple[int, int]
+    nbytes: int
+    quote: str
+    artist_name: str | None
+    display_config: DisplayConfig
+    font_config: FontConfig
+    palette_dir: Path | None
+    compress_level: int
+
+
+def _render_shared(job: _RenderJob) -> tuple[bytes, bool]:
+    """Worker: read the source from shared memory and return the encoded PNG.
+
+    Also returns whether the profile's pipeline was already built.
+    """
+    block = shared_memory.SharedMemory(name=job.buffer_name)
+    try:
+        with block.buf[:job.nbytes] as view:
+            source = Image.frombytes(job.mode, job.size, view)
+    finally:
+        block.close()
+    pipeline, hit = _registry.get(
+        job.display_config, job.font_config, job.palette_dir, job.compress_level
+    )
+    return pipeline.render_png(source, job.quote, job.artist_name), hit
+
+
+class RenderExecutor:
+    """Runs the CPU-heavy render stages off the event loop.
+
+    Renders go to a process pool so concurrent profiles use every core;
+    source pixels are copied once into shared memory instead of being
+    pickled. Images large enough for multi-process dithering, and every
+    render when processes are disabled or the pool cannot start, run on
+    a thread pool in this process instead.
+    """
+
+    def __init__(
+        self,
+        config: RenderConfig,
+        font_config: FontConfig,
+        palette_dir: Path | None = None,
+        parallel: ParallelDiffusion | None = None,
+    ):
+        self._config = config
+        self._font_config = font_config
+        self._palette_dir = palette_dir
+        self._parallel = parallel
+        self._use_processes = config.use_processes and config.workers > 0
+        self._processes: ProcessPoolExecutor | None = None
+        self._threads: ThreadPoolExecutor | None = None
+        self._hits = 0
+        self._misses = 0
+        _configure_worker(config.max_pipelines)
+
+    async def render(
+        self,
+        source: Image.Image,
+        quote: str,
+        artist_name: str | None,
+        display_config: DisplayConfig,
+    ) -> bytes:
+        """Render a source image for a display profile and return PNG bytes."""
+        if self._use_processes and not self._wants_parallel_dither(display_config):
+            try:
+                return await self._render_in_process_pool(
+                    source, quote, artist_name, display_config
+                )
+            except BrokenProcessPool:
+                logger.exception("Render worker pool failed; falling back to threads")
+                self._use_processes = False
+                self._shutdown_processes()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._thread_pool(), self._render_local, source, quote, artist_name, display_config
+        )
+
+    async def warm(self, profiles: list[DisplayConfig], processes: int = 1) -> None:
+        """Build the profiles' pipelines ahead of requests.
+
+        Up to ``processes`` warm-up calls go to the process pool. The pool
+        decides which process runs each, so a call may land on a process
+        that is already warm; processes left cold build pipelines on first
+        use.
+        """
+        loop = asyncio.get_running_loop()
+        level = self._config.png_compress_level
+        local = [p for p in profiles if not self._use_processes or self._wants_parallel_dither(p)]
+        remote = [p for p in profiles if p not in local]
+        if local:
+            await loop.run_in_executor(
+                self._thread_pool(), self._warm_local, local
+            )
+        if remote:
+            try:
+                await asyncio.gather(*(
+                    self._submit(_warm, remote, self._font_config, self._palette_dir, level)
+                    for _ in range(max(1, min(processes, self._config.workers)))
+                ))
+            except BrokenProcessPool:
+                logger.exception("Render worker pool failed; falling back to threads")
+                self._use_processes = False
+                self._shutdown_processes()
+                await loop.run_in_executor(self._thread_pool(), self._warm_local, remote)
+
+    def stats(self) -> dict[str, int]:
+        """Renders that found their profile's pipeline ready, and those that built it."""
+        return {
+            "pipeline_hits": self._hits,
+            "pipeline_misses": self._misses,
+            "max_pipelines": self._config.max_pipelines,
+        }
+
+    def close(self) -> None:
+        """Shut down both worker pools."""
+        self._shutdown_processes()
+        if self._threads is not None:
+            self._threads.shutdown(cancel_futures=True)
+            self._threads = None
+
+    async def _render_in_process_pool(
+        self,
+        source: Image.Image,
+        quote: str,
+        artist_name: str | None,
+        display_config: DisplayConfig,
+    ) -> bytes:
+        pixels = source.tobytes()
+        block = shared_memory.SharedMemory(create=True, size=max(len(pixels), 1))
+        try:
+            block.buf[:len(pixels)] = pixels
+            job = _RenderJob(
+                buffer_name=block.name,
+                mode=source.mode,
+                size=source.size,
+                nbytes=len(pixels),
+                quote=quote,
+                artist_name=artist_name,
+                display_config=display_config,
+                font_config=self._font_config,
+                palette_dir=self._palette_dir,
+                compress_level=self._config.png_compress_level,
+            )
+            png, hit = await self._submit(_render_shared, job)
+            self._count(hit)
+            return png
+        finally:
+            block.close()
+            block.unlink()
+
+    def _render_local(
+        self,
+        source: Image.Image,
+        quote: str,
+        artist_name: str | None,
+        display_config: DisplayConfig,
+    ) -> bytes:
+        pipeline, hit = _registry.get(
+            display_config, self._font_config, self._palette_dir,
+            self._config.png_compress_level, self._parallel,
+        )
+        self._count(hit)
+        return pipeline.render_png(source, quote, artist_name)
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self._hits += 1
+        else:
+            self._misses += 1
+
+    def _warm_local(self, profiles: list[DisplayConfig]) -> None:
+        for display_config in profiles:
+            _registry.get(
+                display_config, self._font_config, self._palette_dir,
+                self._config.png_compress_level, self._parallel,
+            )
+
+    def _wants_parallel_dither(self, display_config: DisplayConfig) -> bool:
+        """Large error-diffused images render here so their dithering can use its own pool."""
+        return (
+            self._parallel is not None
+            and display_config.dither in KERNELS
+            and self._parallel.should_use(display_config.width, display_config.height)
+        )
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> asyncio.Future[T]:
+        """Run a call on the process pool.
+
+        A pool that cannot start is reported as ``BrokenProcessPool``, like
+        one whose workers died; errors raised by the call itself are not.
+        """
+        try:
+            return asyncio.get_running_loop().run_in_executor(self._process_pool(), fn, *args)
+        except (OSError, NotImplementedError) as e:
+            raise BrokenProcessPool("Render worker processes could not start") from e
+
+    def _process_pool(self) -> Executor:
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                max_workers=self._config.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_configure_worker,
+                initargs=(self._config.max_pipelines,),
+            )
+            logger.info("Started %d render workers", self._config.workers)
+        return self._processes
+
+    def _thread_pool(self) -> Executor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=max(self._config.workers, 1), thread_name_prefix="render"
+            )
+        return self._threads
+
+    def _shutdown_processes(self) -> None:
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
@@ -0,0 +1,465 @@
+"""State shared between the server's worker processes."""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from ..config import CoalesceConfig, DisplayConfig
+from ..data import Artist
+from ..models import TimeOfDay
+from .generations import RenderedArt, Slot
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS arts (
+    digest TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    artist_name TEXT,
+    artist_birth_year INTEGER,
+    artist_style TEXT,
+    artist_description TEXT,
+    time_of_day TEXT NOT NULL,
+    generation_id TEXT,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS latest (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    digest TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS flights (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    done_at REAL,
+    digest TEXT,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS pooled (
+    digest TEXT PRIMARY KEY,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    num_colors INTEGER NOT NULL,
+    dither TEXT NOT NULL,
+    slot_time TEXT NOT NULL,
+    slot_artist TEXT,
+    created_at REAL NOT NULL,
+    taken INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pooled_profile ON pooled (width, height, num_colors, dither);
+"""
+
+
+@dataclass(frozen=True)
+class LatestArt:
+    """The most recently served art, as every worker sees it."""
+    image: memoryview
+    etag: str
+    prompt: str
+    quote: str
+    artist: str | None
+    time_of_day: str
+    generation_id: str | None
+    generated_at: datetime
+
+
+class SharedState:
+    """Latest art, counters, generation leases and pooled art shared by all workers.
+
+    uvicorn runs several worker processes, and nginx may send each request
+    to any of them. Metadata lives in a small SQLite (WAL) database that
+    every worker opens; images are files named by their digest, so
+    replacing the latest art is a single row update. The latest image is
+    read through ``mmap`` and served from the page cache without copying.
+
+    ``do`` is the cross-worker counterpart of ``SingleFlight.do``: one
+    worker takes a lease on the key and runs the call, the others poll
+    until its result is stored. The owner renews its lease while the call
+    runs, so a lease left behind by a crashed worker expires after
+    ``lease_seconds`` however long a live generation takes.
+
+    The pre-generation pool lives here too, so an image is handed out by
+    exactly one worker: taking one marks its row in the same statement
+    that finds it. Taken rows stay until they expire, so a refill that
+    returns an image already served does not pool it again.
+    """
+
+    def __init__(self, directory: Path, config: CoalesceConfig):
+        self._config = config
+        self._blob_dir = directory / "art"
+        self._blob_dir.mkdir(parents=True, exist_ok=True)
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            directory / "state.db", timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._mapped: tuple[str, memoryview] | None = None
+
+    async def publish(self, art: RenderedArt) -> None:
+        """Make this the latest art for every worker and count it."""
+        await asyncio.to_thread(self._publish, art)
+
+    async def latest(self) -> LatestArt | None:
+        """The latest art published by any worker."""
+        return await asyncio.to_thread(self._latest)
+
+    async def counter(self, name: str) -> int:
+        """Current value of a shared counter."""
+        return await asyncio.to_thread(self._counter, name)
+
+    async def do(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[RenderedArt]],
+        window_seconds: float | None = None,
+    ) -> RenderedArt:
+        """Await the call for this key in whichever worker runs it first.
+
+        Like ``SingleFlight``, a success is shared for ``window_seconds``
+        (``CoalesceConfig.window_seconds`` unless given) after it finishes
+        and a failure only with callers already waiting.
+        """
+        name = hashlib.sha256(repr(key).encode()).hexdigest()
+        since = time.time()
+        if window_seconds is None:
+            window_seconds = self._config.window_seconds
+        while True:
+            outcome, value = await asyncio.to_thread(self._claim, name, since, window_seconds)
+            if outcome == "owner":
+                break
+            if outcome == "failed":
+                raise RuntimeError(value)
+            if outcome == "done":
+                art = await asyncio.to_thread(self._load, value)
+                if art is not None:
+                    return art
+            await asyncio.sleep(self._config.poll_seconds)
+        heartbeat = asyncio.create_task(self._keep_lease(name))
+        try:
+            art = await call()
+        except Exception as e:
+            await asyncio.to_thread(self._fail, name, str(e))
+            raise
+        except BaseException:
+            # Cancelled: let a waiting worker take over instead of failing it.
+            # The release still finishes if this task is cancelled again.
+            await asyncio.shield(asyncio.to_thread(self._release, name))
+            raise
+        finally:
+            heartbeat.cancel()
+        await asyncio.to_thread(self._finish, name, art)
+        return art
+
+    async def pool_add(
+        self, profile: DisplayConfig, slot: Slot, art: RenderedArt, oldest: datetime
+    ) -> bool:
+        """Pool an image for the profile; False if it is already pooled.
+
+        Every pool call first drops images from another slot or created
+        before ``oldest``.
+        """
+        return await asyncio.to_thread(self._pool_add, profile, slot, art, oldest)
+
+    async def pool_take(
+        self, profile: DisplayConfig, slot: Slot, oldest: datetime
+    ) -> RenderedArt | None:
+        """Remove and return the oldest pooled image for the profile."""
+        return await asyncio.to_thread(self._pool_take, profile, slot, oldest)
+
+    async def pool_counts(
+        self, slot: Slot, oldest: datetime
+    ) -> dict[tuple[int, int, int, str], int]:
+        """Pooled images per (width, height, num_colors, dither)."""
+        return await asyncio.to_thread(self._pool_counts, slot, oldest)
+
+    async def _keep_lease(self, name: str) -> None:
+        """Extend this worker's lease on a key until cancelled."""
+        while True:
+            await asyncio.sleep(self._config.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self._renew, name)
+            except Exception:
+                logger.exception("Renewing a generation lease failed")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction, serialized with every other worker's."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    # Blobs
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._blob_dir / f"{digest}.png"
+
+    def _store(self, db: sqlite3.Connection, art: RenderedArt) -> str:
+        """Write the image and its details unless already stored; inside a transaction."""
+        digest = art.etag.strip('"')
+        path = self._blob_path(digest)
+        if not path.exists():
+            tmp = path.with_suffix(f".{self._owner}.tmp")
+            tmp.write_bytes(art.image_data)
+            os.replace(tmp, path)
+        artist = art.artist
+        db.execute(
+            "INSERT OR IGNORE INTO arts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                digest,
+                art.prompt,
+                art.quote,
+                artist.name if artist else None,
+                artist.birth_year if artist else None,
+                artist.style if artist else None,
+                artist.description if artist else None,
+                art.time_of_day.value,
+                art.generation_id,
+                art.created_at.timestamp(),
+            ),
+        )
+        return digest
+
+    def _collect(self, db: sqlite3.Connection, now: float) -> None:
+        """Forget settled flights and delete images nothing refers to."""
+        keep = max(self._config.window_seconds, self._config.lease_seconds)
+        db.execute(
+            "DELETE FROM flights WHERE COALESCE(done_at, expires_at) < ?", (now - keep,)
+        )
+        orphans = [
+            row[0] for row in db.execute(
+                "SELECT digest FROM arts"
+                " WHERE digest NOT IN (SELECT digest FROM latest)"
+                " AND digest NOT IN (SELECT digest FROM flights WHERE digest IS NOT NULL)"
+                " AND digest NOT IN (SELECT digest FROM pooled WHERE NOT taken)"
+            )
+        ]
+        for digest in orphans:
+            db.execute("DELETE FROM arts WHERE digest = ?", (digest,))
+            # Workers still holding a mapping of it keep reading the old pages.
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def _map(self, digest: str) -> memoryview | None:
+        mapped = self._mapped
+        if mapped is not None and mapped[0] == digest:
+            return mapped[1]
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            # Replaced since the row was read; the next read sees the new one.
+            return None
+        # The previous mapping is released once no response is sending it.
+        self._mapped = (digest, view)
+        return view
+
+    # Latest art and counters
+
+    def _publish(self, art: RenderedArt) -> None:
+        with self._transaction() as db:
+            digest = self._store(db, art)
+            db.execute("INSERT OR REPLACE INTO latest VALUES (1, ?)", (digest,))
+            db.execute(
+                "INSERT INTO counters VALUES ('generation_count', 1)"
+                " ON CONFLICT (name) DO UPDATE SET value = value + 1"
+            )
+            self._collect(db, time.time())
+
+    def _latest(self) -> LatestArt | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT a.* FROM latest l JOIN arts a ON a.digest = l.digest"
+            ).fetchone()
+        if row is None:
+            return None
+        image = self._map(row["digest"])
+        if image is None:
+            return None
+        return LatestArt(
+            image=image,
+            etag=f'"{row["digest"]}"',
+            prompt=row["prompt"],
+            quote=row["quote"],
+            artist=row["artist_name"],
+            time_of_day=row["time_of_day"],
+            generation_id=row["generation_id"],
+            generated_at=datetime.fromtimestamp(row["created_at"]),
+        )
+
+    def _counter(self, name: str) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM counters WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    # Flights
+
+    def _claim(self, name: str, since: float, window: float) -> tuple[str, str | None]:
+        """Take the lease for a key, or report the flight holding or settling it."""
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM flights WHERE key = ?", (name,)).fetchone()
+            if row is not None:
+                if row["done_at"] is None:
+                    if row["expires_at"] > now:
+                        return "running", None
+                elif row["error"] is not None:
+                    if row["done_at"] >= since:
+                        return "failed", row["error"]
+                elif row["done_at"] >= since or now - row["done_at"] < window:
+                    return "done", row["digest"]
+            db.execute(
+                "INSERT OR REPLACE INTO flights (key, owner, expires_at) VALUES (?, ?, ?)",
+                (name, self._owner, now + self._config.lease_seconds),
+            )
+            return "owner", None
+
+    def _renew(self, name: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE flights SET expires_at = ? WHERE key = ? AND owner = ? AND done_at IS NULL",
+                (time.time() + self._config.lease_seconds, name, self._owner),
+            )
+
+    def _finish(self, name: str, art: RenderedArt) -> None:
+        now = time.time()
+        with self._transaction() as db:
+            digest = self._store(db, art)
+            db.execute(
+                "UPDATE flights SET done_at = ?, digest = ? WHERE key = ? AND owner = ?",
+                (now, digest, name, self._owner),
+            )
+            self._collect(db, now)
+
+    def _fail(self, name: str, error: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE flights SET done_at = ?, error = ? WHERE key = ? AND owner = ?",
+                (time.time(), error, name, self._owner),
+            )
+
+    def _release(self, name: str) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "DELETE FROM flights WHERE key = ? AND owner = ?", (name, self._owner)
+            )
+
+    def _load(self, digest: str) -> RenderedArt | None:
+        with self._lock:
+            return self._read(self._db, digest)
+
+    def _read(self, db: sqlite3.Connection, digest: str) -> RenderedArt | None:
+        row = db.execute("SELECT * FROM arts WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            return None
+        try:
+            image_data = self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+        artist = None
+        if row["artist_name"] is not None:
+            artist = Artist(
+                name=row["artist_name"],
+                birth_year=row["artist_birth_year"],
+                style=row["artist_style"],
+                description=row["artist_description"],
+            )
+        return RenderedArt(
+            image_data=image_data,
+            prompt=row["prompt"],
+            quote=row["quote"],
+            artist=artist,
+            time_of_day=TimeOfDay(row["time_of_day"]),
+            generation_id=row["generation_id"],
+            created_at=datetime.fromtimestamp(row["created_at"]),
+        )
+
+    # Pool
+
+    _PROFILE = "width = ? AND height = ? AND num_colors = ? AND dither = ?"
+
+    @staticmethod
+    def _profile_key(profile: DisplayConfig) -> tuple[int, int, int, str]:
+        return profile.width, profile.height, profile.num_colors, profile.dither
+
+    @staticmethod
+    def _prune_pool(db: sqlite3.Connection, slot: Slot, oldest: datetime) -> None:
+        db.execute(
+            "DELETE FROM pooled WHERE slot_time != ? OR slot_artist IS NOT ? OR created_at < ?",
+            (slot[0], slot[1], oldest.timestamp()),
+        )
+
+    def _pool_add(
+        self, profile: DisplayConfig, slot: Slot, art: RenderedArt, oldest: datetime
+    ) -> bool:
+        with self._transaction() as db:
+            self._prune_pool(db, slot, oldest)
+            digest = self._store(db, art)
+            added = db.execute(
+                "INSERT OR IGNORE INTO pooled VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (
+                    digest, *self._profile_key(profile), slot[0], slot[1],
+                    art.created_at.timestamp(),
+                ),
+            ).rowcount
+            self._collect(db, time.time())
+            return added > 0
+
+    def _pool_take(
+        self, profile: DisplayConfig, slot: Slot, oldest: datetime
+    ) -> RenderedArt | None:
+        with self._transaction() as db:
+            self._prune_pool(db, slot, oldest)
+            row = db.execute(
+                "UPDATE pooled SET taken = 1 WHERE digest = ("
+                f"SELECT digest FROM pooled WHERE NOT taken AND {self._PROFILE}"
+                " ORDER BY created_at LIMIT 1"
+                ") RETURNING digest",
+                self._profile_key(profile),
+            ).fetchone()
+            # Read before committing; once taken, the image is collected
+            # when nothing else refers to it.
+            return self._read(db, row[0]) if row is not None else None
+
+    def _pool_counts(self, slot: Slot, oldest: datetime) -> dict[tuple[int, int, int, str], int]:
+        with self._transaction() as db:
+            self._prune_pool(db, slot, oldest)
+            rows = db.execute(
+                "SELECT width, height, num_colors, dither, COUNT(*) FROM pooled"
+                " WHERE NOT taken GROUP BY width, height, num_colors, dither"
+            ).fetchall()
+        return {tuple(row[:4]): row[4] for row in rows}
@@ -0,0 +1,49 @@
+"""Coalescing of concurrent identical requests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Runs at most one call per key at a time and shares its result.
+
+    Callers that arrive while a call for their key is running wait for it
+    instead of starting their own. A successful result keeps being handed
+    out for ``window_seconds`` after it completes, so requests that arrive
+    just after it finishes share it too. Failures are never shared past
+    the callers that were already waiting.
+    """
+
+    def __init__(self, window_seconds: float = 0.0):
+        self._window = window_seconds
+        self._flights: dict[Hashable, asyncio.Task[T]] = {}
+        self._shared = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Await the call for this key, starting it only if none is running."""
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        else:
+            self._shared += 1
+        # A cancelled caller must not cancel the call the others wait on.
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        """Calls running or within their window, and callers that shared one."""
+        return {"flights": len(self._flights), "shared": self._shared}
+
+    def _settle(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if task.cancelled() or task.exception() is not None or self._window <= 0:
+            self._forget(key, task)
+        else:
+            asyncio.get_running_loop().call_later(self._window, self._forget, key, task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task[T]) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
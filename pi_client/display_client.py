@@ -13,6 +13,11 @@ from pathlib import Path
 import httpx
 from PIL import Image
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -73,6 +78,11 @@ class InkyDisplay:
 
     def show(self, image: Image.Image, save_path: Path | None = None):
         """Display image on screen and optionally save to file."""
+        # The server sends paletted PNGs; Inky expects RGB and does its own
+        # palette mapping, so expand the indices to colors first.
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
         # Ensure correct size
         if image.size != (self.width, self.height):
             image = image.resize((self.width, self.height), Image.Resampling.LANCZOS)
@@ -94,6 +104,36 @@ class InkyDisplay:
             logger.info("Display updated!")
 
 
+    def show_framebuffer(
+        self,
+        indices: "numpy.ndarray",
+        palette: dict[int, tuple[int, int, int]],
+        save_path: Path | None = None,
+    ):
+        """Display panel color indices from /art.raw without re-mapping pixels."""
+        if not self.simulate and indices.shape != self.display.buf.shape:
+            raise ValueError(f"framebuffer {indices.shape} != panel {self.display.buf.shape}")
+
+        if save_path or self.simulate:
+            preview = Image.fromarray(indices, "P")
+            flat = [0] * (3 * (max(palette) + 1))
+            for index, rgb in palette.items():
+                flat[3 * index:3 * index + 3] = rgb
+            preview.putpalette(flat)
+            if save_path:
+                preview.save(save_path)
+                logger.info(f"Image saved to {save_path}")
+            if self.simulate:
+                preview.save(Path("/tmp/inky_preview.png"))
+                logger.info("Simulation: Image saved to /tmp/inky_preview.png")
+                return
+
+        logger.info("Updating display (this takes ~30 seconds)...")
+        self.display.buf[:] = indices
+        self.display.show()
+        logger.info("Display updated!")
+
+
 class ContentClient:
     """Client to fetch content from Pi2W server."""
 
@@ -137,6 +177,48 @@ class ContentClient:
         image = Image.open(io.BytesIO(response.content))
         return image
 
+    def get_framebuffer(
+        self,
+        width: int,
+        height: int,
+        colors: int = 7,
+        style: str | None = None,
+        prompt: str | None = None,
+    ) -> tuple["numpy.ndarray", dict[int, tuple[int, int, int]]]:
+        """Fetch art as panel color indices, already in the driver's order.
+        
+        Returns:
+            Tuple of (height x width index array, panel index -> RGB palette).
+        """
+        params = {"width": width, "height": height, "colors": colors}
+        if style:
+            params["style"] = style
+        if prompt:
+            params["prompt"] = prompt
+
+        logger.info(f"Requesting framebuffer from server ({width}x{height}, {colors} colors)...")
+        response = self.client.get(f"{self.server_url}/art.raw", params=params)
+        response.raise_for_status()
+
+        time_of_day = response.headers.get("X-Time-Of-Day", "unknown")
+        logger.info(f"Received art for time of day: {time_of_day}")
+
+        # Unpack MSB-first: 2 pixels per byte at 4 bits, 4 pixels at 2 bits
+        w = int(response.headers["X-Width"])
+        h = int(response.headers["X-Height"])
+        bits = int(response.headers["X-Bits-Per-Pixel"])
+        per_byte = 8 // bits
+        shifts = numpy.arange(per_byte - 1, -1, -1, dtype=numpy.uint8) * bits
+        packed = numpy.frombuffer(response.content, dtype=numpy.uint8)
+        indices = (packed[:, None] >> shifts) & ((1 << bits) - 1)
+        indices = indices.ravel()[:w * h].reshape(h, w)
+
+        palette = {}
+        for entry in response.headers["X-Palette"].split(","):
+            index, rgb = entry.split(":")
+            palette[int(index)] = tuple(int(rgb[i:i + 2], 16) for i in (0, 2, 4))
+        return indices, palette
+
     def close(self):
         """Close the HTTP client."""
         self.client.close()
@@ -174,6 +256,12 @@ def main():
         default=Path(__file__).parent / "latest.png",
         help="Path to save latest displayed image"
     )
+    parser.add_argument(
+        "--packed",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Fetch a packed framebuffer (/art.raw) instead of a PNG"
+    )
 
     args = parser.parse_args()
 
@@ -192,14 +280,33 @@ def main():
         while True:
             try:
                 # Fetch and display art
-                image = client.get_art(
-                    width=display.width,
-                    height=display.height,
-                    colors=display.num_colors,
-                    style=args.style,
-                    prompt=args.prompt,
-                )
-                display.show(image, save_path=args.save_path)
+                shown = False
+                if args.packed and numpy is not None:
+                    try:
+                        indices, palette = client.get_framebuffer(
+                            width=display.width,
+                            height=display.height,
+                            colors=display.num_colors,
+                            style=args.style,
+                            prompt=args.prompt,
+                        )
+                        display.show_framebuffer(indices, palette, save_path=args.save_path)
+                        shown = True
+                    except httpx.HTTPStatusError as e:
+                        if e.response.status_code != 404:
+                            raise
+                        logger.warning("Server has no /art.raw, falling back to PNG")
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Packed framebuffer unusable ({e}), falling back to PNG")
+                if not shown:
+                    image = client.get_art(
+                        width=display.width,
+                        height=display.height,
+                        colors=display.num_colors,
+                        style=args.style,
+                        prompt=args.prompt,
+                    )
+                    display.show(image, save_path=args.save_path)
 
                 if args.interval <= 0:
                     break
@@ -2,11 +2,13 @@
 """Pi2W Display Service - webhook + scheduled refreshes using uvicorn/starlette."""
 
 import asyncio
+import hashlib
 import logging
 import os
 import subprocess
 import time
-from datetime import datetime
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
 
 import httpx
@@ -56,6 +58,7 @@ refresh_count = 0
 skipped_empty = 0  # Skipped due to no occupancy
 skipped_quiet = 0  # Skipped during quiet hours (no occupancy)
 service_start_time = datetime.now()
+latest_image: tuple[os.stat_result, str, bytes] | None = None  # (stat, etag, bytes)
 
 
 def is_quiet_hours() -> bool:
@@ -185,21 +188,60 @@ async def refresh_endpoint(request):
         return PlainTextResponse("Skipped (too soon)")
 
 
+def is_not_modified(request, etag: str, last_modified: datetime) -> bool:
+    """Check If-None-Match, or If-Modified-Since when no entity tags were sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _same_file(a: os.stat_result, b: os.stat_result) -> bool:
+    return (a.st_ino, a.st_mtime_ns, a.st_size) == (b.st_ino, b.st_mtime_ns, b.st_size)
+
+
 async def latest_art(request):
-    """Serve the latest displayed image."""
-    if not LATEST_IMAGE_PATH.exists():
+    """Serve the latest displayed image, or 304 if the client already has it."""
+    global latest_image
+    try:
+        stat = LATEST_IMAGE_PATH.stat()
+        # Read and hash each new image once; repeat polls only stat the file.
+        # The body, ETag and dates all come from one read of one open file,
+        # so a replacement in between is picked up by the next poll.
+        if latest_image is None or not _same_file(latest_image[0], stat):
+            with LATEST_IMAGE_PATH.open("rb") as f:
+                stat = os.fstat(f.fileno())
+                image_data = f.read()
+            latest_image = (stat, f'"{hashlib.sha256(image_data).hexdigest()[:32]}"', image_data)
+    except FileNotFoundError:
         return PlainTextResponse("No image available", status_code=404)
-
-    image_data = LATEST_IMAGE_PATH.read_bytes()
-    mtime = datetime.fromtimestamp(LATEST_IMAGE_PATH.stat().st_mtime)
+    stat, etag, image_data = latest_image
+
+    mtime = datetime.fromtimestamp(stat.st_mtime)
+    last_modified = datetime.fromtimestamp(stat.st_mtime, UTC)
+    headers = {
+        "X-Generated-At": mtime.isoformat(),
+        "Cache-Control": "public, max-age=60",
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+    }
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
 
     return Response(
         content=image_data,
         media_type="image/png",
-        headers={
-            "X-Generated-At": mtime.isoformat(),
-            "Cache-Control": "public, max-age=60",
-        },
+        headers=headers,
     )
 
 
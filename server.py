@@ -2,10 +2,21 @@
 
 import uvicorn
 
-from pi2w.app import create_app
-
-app = create_app()
+from pi2w.config import ServerConfig
 
 if __name__ == "__main__":
-    print("Starting Pi2W Content Server on http://0.0.0.0:8000")
-    uvicorn.run("server:app", host="0.0.0.0", port=8000, workers=4)
+    config = ServerConfig()
+    print(f"Starting Pi2W Content Server on http://{config.host}:{config.port}")
+    # Each worker builds its own app from the factory. Nothing here creates
+    # one at import, so processes spawned by the render and dithering pools,
+    # which re-import this module, stay light.
+    uvicorn.run(
+        "pi2w.app:create_app",
+        factory=True,
+        host=config.host,
+        port=config.port,
+        workers=config.workers,
+        # uvicorn waits for open connections before running the app's
+        # shutdown, and an /events stream never closes on its own.
+        timeout_graceful_shutdown=config.graceful_shutdown_seconds,
+    )
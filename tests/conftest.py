@@ -0,0 +1,46 @@
+"""Shared fixtures: an app whose OpenAI calls are answered locally."""
+
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import pi2w.app as app_module
+from pi2w.adapters import GeneratedImage
+from pi2w.config import PoolConfig, RenderConfig
+
+
+class FakeOpenAI:
+    """Answers text and image calls without the network; every image differs."""
+
+    image_calls = 0
+
+    def __init__(self, *args, **kwargs):
+        self._rng = np.random.default_rng()
+
+    async def generate_text(self, system_prompt, user_prompt, max_tokens=50, temperature=0.9):
+        return "A quiet river remembers the mountain"
+
+    async def generate_image(self, prompt, size="1792x1024"):
+        FakeOpenAI.image_calls += 1
+        pixels = self._rng.integers(0, 256, (64, 96, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).resize((448, 256)).save(buffer, format="PNG")
+        return GeneratedImage(data=buffer.getvalue())
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """TestClient for an app storing its data under tmp_path, with the pool off."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FakeOpenAI, "image_calls", 0)
+    monkeypatch.setattr(app_module, "OpenAIAdapter", FakeOpenAI)
+    monkeypatch.setattr(app_module, "PoolConfig", lambda: PoolConfig(enabled=False))
+    monkeypatch.setattr(app_module, "RenderConfig", lambda: RenderConfig(use_processes=False))
+    with TestClient(app_module.create_app()) as test_client:
+        yield test_client
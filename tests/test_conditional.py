@@ -0,0 +1,58 @@
+"""ETag and Last-Modified validators on the image endpoints."""
+
+import pytest
+
+
+@pytest.fixture
+def art(client):
+    response = client.get("/art")
+    assert response.status_code == 200
+    return response
+
+
+@pytest.mark.parametrize("path", ["/art", "/art/latest", "/art/latest?width=400&height=240"])
+def test_matching_etag_gets_304(client, art, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["last-modified"] == first.headers["last-modified"]
+
+
+@pytest.mark.parametrize(
+    "if_none_match", ['"other", {etag}', "W/{etag}", "*"]
+)
+def test_etag_lists_weak_tags_and_wildcard_match(client, art, if_none_match):
+    etag = art.headers["etag"]
+    response = client.get(
+        "/art/latest", headers={"If-None-Match": if_none_match.format(etag=etag)}
+    )
+    assert response.status_code == 304
+
+
+def test_stale_etag_gets_the_image(client, art):
+    response = client.get("/art/latest", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == art.content
+
+
+def test_if_modified_since(client, art):
+    last_modified = art.headers["last-modified"]
+    assert client.get(
+        "/art/latest", headers={"If-Modified-Since": last_modified}
+    ).status_code == 304
+    assert client.get(
+        "/art/latest", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}
+    ).status_code == 200
+
+
+def test_if_none_match_takes_precedence(client, art):
+    response = client.get("/art/latest", headers={
+        "If-None-Match": '"stale"',
+        "If-Modified-Since": art.headers["last-modified"],
+    })
+    assert response.status_code == 200
@@ -0,0 +1,73 @@
+"""Wavefront and multi-process error diffusion against a per-pixel reference."""
+
+import numpy as np
+import pytest
+
+from pi2w.config import get_palette
+from pi2w.imaging.dither import (
+    FRACTION_BITS,
+    KERNELS,
+    MAX_VALUE,
+    SCALE,
+    ErrorDiffusionDitherer,
+)
+from pi2w.imaging.palette import PaletteLUT
+from pi2w.imaging.parallel import ParallelDiffusion
+
+
+@pytest.fixture(scope="module")
+def lut() -> PaletteLUT:
+    return PaletteLUT.compile(get_palette(6))
+
+
+def random_image(height: int, width: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def reference_diffusion(rgb: np.ndarray, lut: PaletteLUT, method: str) -> np.ndarray:
+    """Classic raster error diffusion, one pixel at a time, in the same fixed point."""
+    kernel = KERNELS[method]
+    height, width = rgb.shape[:2]
+    buf = rgb.astype(np.int64) * SCALE
+    palette = lut.palette.astype(np.int64) * SCALE
+    out = np.empty((height, width), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            value = np.clip(buf[y, x], 0, MAX_VALUE)
+            index = lut.lookup(value[np.newaxis], FRACTION_BITS)[0]
+            out[y, x] = index
+            error = value - palette[index]
+            for dy, dx, weight in kernel.weights:
+                ty, tx = y + dy, x + dx
+                if ty < height and 0 <= tx < width:
+                    buf[ty, tx] += (error * weight + kernel.divisor // 2) // kernel.divisor
+    return out
+
+
+@pytest.mark.parametrize("method", sorted(KERNELS))
+@pytest.mark.parametrize("shape", [(1, 1), (1, 17), (17, 1), (23, 31)])
+def test_wavefront_matches_per_pixel_diffusion(lut, method, shape):
+    rgb = random_image(*shape)
+    result = ErrorDiffusionDitherer(lut, method).dither(rgb)
+    np.testing.assert_array_equal(result, reference_diffusion(rgb, lut, method))
+
+
+@pytest.mark.parametrize("method", sorted(KERNELS))
+def test_parallel_diffusion_matches_single_process(lut, method):
+    rgb = random_image(96, 80, seed=1)
+    parallel = ParallelDiffusion(workers=3, min_pixels=0)
+    try:
+        result = parallel.dither(rgb, lut, method)
+    finally:
+        parallel.close()
+    np.testing.assert_array_equal(result, ErrorDiffusionDitherer(lut, method).dither(rgb))
+
+
+def test_parallel_diffusion_with_more_bands_than_rows(lut):
+    rgb = random_image(3, 40, seed=2)
+    parallel = ParallelDiffusion(workers=8, min_pixels=0)
+    try:
+        result = parallel.dither(rgb, lut, "jarvis")
+    finally:
+        parallel.close()
+    np.testing.assert_array_equal(result, ErrorDiffusionDitherer(lut, "jarvis").dither(rgb))
@@ -0,0 +1,66 @@
+"""Packing paletted images into the panels' native framebuffer layout."""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from pi2w.config import get_palette
+from pi2w.imaging.framebuffer import PANEL_INDICES, pack_framebuffer
+
+
+def paletted(indices: np.ndarray, num_colors: int) -> Image.Image:
+    image = Image.fromarray(indices.astype(np.uint8), mode="P")
+    image.putpalette([c for color in get_palette(num_colors) for c in color])
+    return image
+
+
+def unpack(data: bytes, bits: int, count: int) -> list[int]:
+    per_byte = 8 // bits
+    mask = (1 << bits) - 1
+    values = [
+        (byte >> (bits * (per_byte - 1 - i))) & mask for byte in data for i in range(per_byte)
+    ]
+    return values[:count]
+
+
+@pytest.mark.parametrize(("num_colors", "bits"), [(2, 2), (3, 2), (6, 4), (7, 4)])
+def test_palette_indices_map_to_panel_indices(num_colors, bits):
+    indices = np.arange(num_colors)[np.newaxis, :]
+    framebuffer = pack_framebuffer(paletted(indices, num_colors), num_colors)
+
+    assert framebuffer.bits == bits
+    assert unpack(framebuffer.data, bits, num_colors) == list(PANEL_INDICES[num_colors])
+    for index, color in enumerate(get_palette(num_colors)):
+        assert framebuffer.palette[PANEL_INDICES[num_colors][index]] == color
+
+
+def test_known_panel_colors():
+    def panel_index(num_colors, color):
+        return PANEL_INDICES[num_colors][get_palette(num_colors).index(color)]
+
+    # Inky: WHITE 0, BLACK 1, RED 2 on pHAT/wHAT; BLACK 0, WHITE 1 on color panels.
+    assert panel_index(2, (255, 255, 255)) == 0
+    assert panel_index(3, (255, 0, 0)) == 2
+    assert panel_index(6, (255, 255, 0)) == 2
+    assert panel_index(6, (0, 0, 255)) == 5
+    assert panel_index(7, (255, 128, 0)) == 6
+
+
+@pytest.mark.parametrize("num_colors", [2, 3, 6, 7])
+def test_rows_pack_msb_first_and_pad_the_last_byte(num_colors):
+    rng = np.random.default_rng(num_colors)
+    indices = rng.integers(0, num_colors, (3, 5))
+    framebuffer = pack_framebuffer(paletted(indices, num_colors), num_colors)
+
+    per_byte = 8 // framebuffer.bits
+    assert len(framebuffer.data) == -(-indices.size // per_byte)
+    expected = [PANEL_INDICES[num_colors][i] for i in indices.ravel()]
+    assert unpack(framebuffer.data, framebuffer.bits, indices.size) == expected
+    padding = unpack(framebuffer.data, framebuffer.bits, len(framebuffer.data) * per_byte)
+    assert padding[indices.size:] == [0] * (len(padding) - indices.size)
+    assert framebuffer.headers()["X-Width"] == "5"
+
+
+def test_rejects_unpaletted_images():
+    with pytest.raises(ValueError, match="paletted"):
+        pack_framebuffer(Image.new("RGB", (4, 4)), 6)
@@ -0,0 +1,159 @@
+"""The on-disk generation history: pagination, filters and eviction."""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+
+from pi2w.config import DisplayConfig, HistoryConfig
+from pi2w.data import Artist
+from pi2w.models import TimeOfDay
+from pi2w.services.generations import Generation, RenderedArt
+from pi2w.services.history import HistoryStore
+
+MB = 1024 * 1024
+PROFILE = DisplayConfig(width=400, height=240)
+
+
+def generation(minutes_ago: float, size: int = 1000, **fields) -> Generation:
+    fields.setdefault("time_of_day", TimeOfDay.MORNING)
+    return Generation(
+        source=Image.new("RGB", (8, 8)),
+        prompt="prompt",
+        quote="quote",
+        slot=(fields["time_of_day"].value, None),
+        created_at=datetime.now() - timedelta(minutes=minutes_ago),
+        encoded=os.urandom(size),
+        artist=fields.pop("artist", None),
+        **fields,
+    )
+
+
+def render(item: Generation, size: int = 1000) -> RenderedArt:
+    return RenderedArt(
+        image_data=os.urandom(size),
+        prompt=item.prompt,
+        quote=item.quote,
+        artist=item.artist,
+        time_of_day=item.time_of_day,
+        generation_id=item.id,
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    def open_store(**config) -> HistoryStore:
+        opened = HistoryStore(tmp_path, HistoryConfig(**config))
+        stores.append(opened)
+        return opened
+
+    stores: list[HistoryStore] = []
+    yield open_store
+    for opened in stores:
+        asyncio.run(opened.aclose())
+
+
+def record(history: HistoryStore, *items: Generation) -> None:
+    async def run():
+        for item in items:
+            history.record_generation(item)
+            await history.flush()
+
+    asyncio.run(run())
+
+
+def blobs(tmp_path) -> int:
+    return sum(1 for path in (tmp_path / "blobs").rglob("*") if path.is_file())
+
+
+def test_pages_are_newest_first(store):
+    history = store()
+    items = [generation(minutes_ago=10 - i) for i in range(5)]
+    record(history, *items)
+    newest_first = [item.id for item in reversed(items)]
+
+    pages = [asyncio.run(history.page(page, per_page=2)) for page in (1, 2, 3, 4)]
+    assert [[entry["id"] for entry in entries] for entries, _ in pages] == [
+        newest_first[:2], newest_first[2:4], newest_first[4:], []
+    ]
+    assert {total for _, total in pages} == {5}
+
+
+def test_filters_narrow_the_pages_and_the_total(store):
+    history = store()
+    artist = Artist("Claude Monet", 1840, "impressionism", "light on water")
+    items = [
+        generation(3, artist=artist),
+        generation(2, time_of_day=TimeOfDay.NIGHT),
+        generation(1, artist=artist, time_of_day=TimeOfDay.NIGHT),
+    ]
+    record(history, *items)
+
+    async def run():
+        history.record_render(items[1].id, PROFILE, render(items[1]))
+        by_artist = await history.page(artist="Claude Monet")
+        by_time = await history.page(time_of_day="night")
+        by_profile = await history.page(profile=PROFILE)
+        return by_artist, by_time, by_profile
+
+    by_artist, by_time, by_profile = asyncio.run(run())
+    assert [e["id"] for e in by_artist[0]] == [items[2].id, items[0].id]
+    assert by_artist[1] == 2
+    assert [e["id"] for e in by_time[0]] == [items[2].id, items[1].id]
+    assert [e["id"] for e in by_profile[0]] == [items[1].id]
+    assert by_profile[0][0]["renders"][0]["width"] == PROFILE.width
+
+
+def test_expired_generations_are_evicted_with_their_renders(store, tmp_path):
+    old = generation(minutes_ago=2 * 24 * 60)
+    earlier = store(max_age_days=3)
+    record(earlier, old)
+
+    async def run():
+        earlier.record_render(old.id, PROFILE, render(old))
+        await earlier.aclose()
+
+    asyncio.run(run())
+    history = store(max_age_days=1)
+    record(history, generation(minutes_ago=0))
+
+    entries, total = asyncio.run(history.page())
+    assert total == 1
+    assert entries[0]["id"] != old.id
+    assert asyncio.run(history.rendered(old.id, PROFILE)) is None
+    assert blobs(tmp_path) == 1
+
+
+def test_oldest_generations_are_evicted_beyond_the_size_budget(store, tmp_path):
+    history = store(max_size_mb=1)
+    items = [generation(minutes_ago=10 - i, size=MB // 3) for i in range(5)]
+    record(history, *items)
+
+    entries, total = asyncio.run(history.page())
+    assert [e["id"] for e in entries] == [item.id for item in reversed(items[-3:])]
+    assert total == 3
+    assert blobs(tmp_path) == 3
+
+
+def test_the_newest_generation_is_kept_however_large(store):
+    history = store(max_size_mb=1)
+    record(history, generation(minutes_ago=1), generation(minutes_ago=0, size=2 * MB))
+
+    entries, total = asyncio.run(history.page())
+    assert total == 1
+    assert entries[0]["source_bytes"] == 2 * MB
+
+
+def test_shared_blobs_outlive_one_evicted_generation(store, tmp_path):
+    old = generation(minutes_ago=2 * 24 * 60)
+    record(store(max_age_days=3), old)
+    new = generation(minutes_ago=0)
+    new.encoded = old.encoded
+    history = store(max_age_days=1)
+    record(history, new)
+
+    assert asyncio.run(history.get(old.id)) is None
+    assert asyncio.run(history.source(new.id)) == old.encoded
+    assert blobs(tmp_path) == 1
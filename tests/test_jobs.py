@@ -0,0 +1,35 @@
+"""Queued generation jobs: 202 Accepted, polling and the finished image."""
+
+import time
+
+from conftest import FakeOpenAI
+
+
+def wait_for(client, job_id, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["state"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_is_accepted_then_polled_to_completion(client):
+    response = client.post("/jobs?width=400&height=240&colors=6")
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/jobs/{job_id}"
+
+    job = wait_for(client, job_id)
+    assert job["state"] == "succeeded"
+    image = client.get(f"/jobs/{job_id}/image")
+    assert image.status_code == 200
+    assert image.headers["content-type"] == "image/png"
+    assert FakeOpenAI.image_calls == 1
+
+
+def test_unknown_jobs_and_invalid_parameters(client):
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/image").status_code == 404
+    assert client.post("/jobs?colors=5").status_code == 400
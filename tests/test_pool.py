@@ -0,0 +1,107 @@
+"""The pre-generation pool shared by every worker process."""
+
+import asyncio
+import itertools
+
+from pi2w.config import CoalesceConfig, DisplayConfig, PoolConfig
+from pi2w.models import TimeOfDay
+from pi2w.services.generations import RenderedArt
+from pi2w.services.pool import ArtPool
+from pi2w.services.shared import SharedState
+
+PROFILE = DisplayConfig(width=400, height=240)
+
+
+class FakeArtService:
+    """Renders a distinct image per call after a short delay."""
+
+    def __init__(self):
+        self.calls = 0
+        self._ids = itertools.count()
+
+    def resolve_display_config(self, width=None, height=None, num_colors=None, dither=None):
+        return DisplayConfig(
+            width=width or PROFILE.width,
+            height=height or PROFILE.height,
+            num_colors=num_colors or PROFILE.num_colors,
+            dither=dither or PROFILE.dither,
+        )
+
+    async def render_art(self, time_of_day, **profile):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        generation_id = f"gen{next(self._ids)}"
+        return RenderedArt(
+            image_data=generation_id.encode(),
+            prompt="prompt",
+            quote="quote",
+            artist=None,
+            time_of_day=time_of_day,
+            generation_id=generation_id,
+        )
+
+
+def workers(tmp_path, count, depth=1):
+    """Pools of ``count`` worker processes sharing one state directory."""
+    service = FakeArtService()
+    coalesce = CoalesceConfig(poll_seconds=0.01)
+    pools = [
+        ArtPool(service, PoolConfig(depth=depth), SharedState(tmp_path, coalesce))
+        for _ in range(count)
+    ]
+    return service, pools
+
+
+async def fill(pools):
+    """Run one refill pass in every worker and wait for the producers."""
+    for pool in pools:
+        pool._touch(PROFILE)
+    await asyncio.gather(*(pool._fill() for pool in pools))
+    await asyncio.gather(*(task for pool in pools for task in list(pool._producers)))
+
+
+def test_workers_refilling_together_pool_one_image(tmp_path):
+    async def run():
+        service, pools = workers(tmp_path, 4)
+        await fill(pools)
+        assert service.calls == 1
+        assert await pools[0].stats() == {"400x240x6/floyd-steinberg": 1}
+
+    asyncio.run(run())
+
+
+def test_each_pooled_image_is_served_once(tmp_path):
+    async def run():
+        service, pools = workers(tmp_path, 2, depth=3)
+        for _ in range(3):
+            await fill(pools)
+        served = [await pool.pop(PROFILE) for pool in (*pools, *pools)]
+        images = [art.image_data for art in served if art is not None]
+        assert len(images) == 3
+        assert len(set(images)) == 3
+        assert service.calls == 3
+        assert await pools[0].pop(PROFILE) is None
+
+    asyncio.run(run())
+
+
+def test_full_pool_is_not_refilled_by_another_worker(tmp_path):
+    async def run():
+        service, pools = workers(tmp_path, 2)
+        await fill(pools[:1])
+        await fill(pools[1:])
+        assert service.calls == 1
+
+    asyncio.run(run())
+
+
+def test_images_from_another_slot_are_dropped(tmp_path, monkeypatch):
+    async def run():
+        _, pools = workers(tmp_path, 1)
+        await fill(pools)
+        monkeypatch.setattr(
+            "pi2w.services.pool.current_slot", lambda: (TimeOfDay.NIGHT.value, "Someone")
+        )
+        assert await pools[0].pop(PROFILE) is None
+
+    asyncio.run(run())
@@ -0,0 +1,147 @@
+"""Generation leases and latest art shared between worker processes."""
+
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+from pi2w.config import CoalesceConfig
+from pi2w.models import TimeOfDay
+from pi2w.services.generations import RenderedArt
+from pi2w.services.shared import SharedState
+
+
+class Generator:
+    """Counts calls and returns a distinct image from each."""
+
+    def __init__(self, delay: float = 0.1, fail: bool = False):
+        self.calls = 0
+        self._delay = delay
+        self._fail = fail
+
+    async def __call__(self) -> RenderedArt:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._fail:
+            raise RuntimeError("generation failed")
+        return RenderedArt(
+            image_data=f"image {self.calls}".encode(),
+            prompt="prompt",
+            quote="quote",
+            artist=None,
+            time_of_day=TimeOfDay.MORNING,
+            generation_id=f"gen{self.calls}",
+        )
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """SharedState instances on one directory, as separate workers would open it."""
+    opened: list[SharedState] = []
+
+    def open_workers(count: int = 2, **config) -> list[SharedState]:
+        config = {"poll_seconds": 0.01, **config}
+        states = [SharedState(tmp_path, CoalesceConfig(**config)) for _ in range(count)]
+        opened.extend(states)
+        return states
+
+    yield open_workers
+    for state in opened:
+        state.close()
+
+
+def test_concurrent_workers_share_one_call(workers):
+    async def run():
+        states = workers(3)
+        call = Generator()
+        results = await asyncio.gather(*(state.do("key", call) for state in states))
+        assert call.calls == 1
+        assert {art.generation_id for art in results} == {"gen1"}
+        assert {art.image_data for art in results} == {b"image 1"}
+
+    asyncio.run(run())
+
+
+def test_finished_result_is_reused_within_the_window(workers):
+    async def run():
+        first, second = workers(window_seconds=0.2)
+        call = Generator(delay=0)
+        await first.do("key", call)
+        assert (await second.do("key", call)).generation_id == "gen1"
+        assert (await second.do("key", call, window_seconds=0)).generation_id == "gen2"
+        await asyncio.sleep(0.3)
+        assert (await first.do("key", call)).generation_id == "gen3"
+
+    asyncio.run(run())
+
+
+def test_failure_reaches_only_waiting_workers(workers):
+    async def run():
+        first, second = workers(window_seconds=10)
+        failing = Generator(fail=True)
+        outcomes = await asyncio.gather(
+            first.do("key", failing), second.do("key", failing), return_exceptions=True
+        )
+        assert failing.calls == 1
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+        assert (await second.do("key", Generator(delay=0))).generation_id == "gen1"
+
+    asyncio.run(run())
+
+
+def test_lease_is_renewed_while_the_call_runs(workers):
+    async def run():
+        first, second = workers(lease_seconds=0.15)
+        call = Generator(delay=0.6)
+        owner = asyncio.create_task(first.do("key", call))
+        await asyncio.sleep(0.05)
+        waiter = await second.do("key", call)
+        assert call.calls == 1
+        assert waiter.generation_id == (await owner).generation_id
+
+    asyncio.run(run())
+
+
+def test_lease_of_a_crashed_worker_expires(workers):
+    async def run():
+        crashed, survivor = workers(lease_seconds=0.3)
+        # Take the lease the way do() does, then never finish or renew it.
+        name = hashlib.sha256(repr("key").encode()).hexdigest()
+        assert crashed._claim(name, time.time(), 0)[0] == "owner"
+
+        started = time.monotonic()
+        art = await survivor.do("key", Generator(delay=0))
+        assert art.generation_id == "gen1"
+        assert time.monotonic() - started >= 0.25
+
+    asyncio.run(run())
+
+
+def test_cancelled_owner_hands_the_key_over(workers):
+    async def run():
+        first, second = workers(lease_seconds=60)
+        owner = asyncio.create_task(first.do("key", Generator(delay=10)))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(second.do("key", Generator(delay=0)))
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        art = await asyncio.wait_for(waiter, 2)
+        assert art.generation_id == "gen1"
+
+    asyncio.run(run())
+
+
+def test_latest_art_and_counter_are_seen_by_every_worker(workers):
+    async def run():
+        first, second = workers()
+        assert await second.latest() is None
+        art = await Generator(delay=0)()
+        await first.publish(art)
+        latest = await second.latest()
+        assert bytes(latest.image) == art.image_data
+        assert latest.etag == art.etag
+        assert latest.generation_id == "gen1"
+        assert await second.counter("generation_count") == 1
+
+    asyncio.run(run())
@@ -0,0 +1,74 @@
+"""Coalescing of concurrent identical calls."""
+
+import asyncio
+
+import pytest
+
+from pi2w.services.singleflight import SingleFlight
+
+
+class Counter:
+    def __init__(self, delay: float = 0.02, fail: bool = False):
+        self.calls = 0
+        self._delay = delay
+        self._fail = fail
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._fail:
+            raise RuntimeError("boom")
+        return self.calls
+
+
+def test_concurrent_callers_share_one_call():
+    async def run():
+        flights: SingleFlight[int] = SingleFlight()
+        call = Counter()
+        results = await asyncio.gather(*(flights.do("key", call) for _ in range(5)))
+        assert results == [1] * 5
+        assert call.calls == 1
+        assert flights.stats()["shared"] == 4
+
+    asyncio.run(run())
+
+
+def test_result_is_shared_within_the_window_only():
+    async def run():
+        flights: SingleFlight[int] = SingleFlight(window_seconds=0.05)
+        call = Counter(delay=0)
+        assert await flights.do("key", call) == 1
+        assert await flights.do("key", call) == 1
+        await asyncio.sleep(0.1)
+        assert await flights.do("key", call) == 2
+
+    asyncio.run(run())
+
+
+def test_failures_are_not_shared_with_later_callers():
+    async def run():
+        flights: SingleFlight[int] = SingleFlight(window_seconds=10)
+        failing = Counter(fail=True)
+        for outcome in await asyncio.gather(
+            flights.do("key", failing), flights.do("key", failing), return_exceptions=True
+        ):
+            assert isinstance(outcome, RuntimeError)
+        assert failing.calls == 1
+        assert await flights.do("key", Counter(delay=0)) == 1
+
+    asyncio.run(run())
+
+
+def test_a_cancelled_caller_does_not_cancel_the_others():
+    async def run():
+        flights: SingleFlight[int] = SingleFlight()
+        call = Counter(delay=0.05)
+        first = asyncio.create_task(flights.do("key", call))
+        second = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == 1
+
+    asyncio.run(run())